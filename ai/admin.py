@@ -1,11 +1,40 @@
-from django.contrib import admin
-from ai.models import AIPlantAnswer
+from django.contrib import admin, messages
+from ai.models import AIPlantAnswer, PlantCheckerCache, PlantRecognizerCache
 
 
 class AIPlantAnswerAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user', 'plant', 'status', 'created', 'error_message')
-    list_filter = ('status', 'plant__name')
+    list_display = ('id', 'user', 'plant', 'status', 'from_cache', 'created', 'error_message')
+    list_filter = ('status', 'from_cache', 'plant__name')
     search_fields = ('plant__name', 'error_message')
 
 
+class TTLCacheAdminMixin:
+    """Purge actions of the cache models (TTLCacheQuerySet)"""
+    actions = ['purge', 'purge_expired']
+
+    @admin.action(description='Purge selected cache entries')
+    def purge(self, request, queryset):
+        deleted, _ = queryset.delete()
+        self.message_user(request, f'{deleted} cache entries purged', messages.SUCCESS)
+
+    @admin.action(description='Purge all expired cache entries')
+    def purge_expired(self, request, queryset):
+        deleted, _ = self.model.objects.expired().delete()
+        self.message_user(request, f'{deleted} expired cache entries purged', messages.SUCCESS)
+
+
+class PlantCheckerCacheAdmin(TTLCacheAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'normalized_name', 'language', 'hits', 'created', 'updated')
+    list_filter = ('language',)
+    search_fields = ('normalized_name',)
+
+
+class PlantRecognizerCacheAdmin(TTLCacheAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'image_hash', 'language', 'plant_name', 'hits', 'created', 'updated')
+    list_filter = ('language',)
+    search_fields = ('plant_name', 'image_hash')
+
+
 admin.site.register(AIPlantAnswer, AIPlantAnswerAdmin)
+admin.site.register(PlantCheckerCache, PlantCheckerCacheAdmin)
+admin.site.register(PlantRecognizerCache, PlantRecognizerCacheAdmin)
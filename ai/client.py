@@ -1,12 +1,31 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from django.conf import settings
+from PIL import Image, ImageOps
+from pyPlants.image_derivatives import encode_image
 import base64
 import json
 import os
 
 
+def prepare_vision_image(image_path: str):
+    """
+    Returns the image sent to the vision model: downscaled to AI_VISION_IMAGE_MAX_SIZE (long edge)
+    and re-encoded as a JPEG of AI_VISION_IMAGE_QUALITY, whatever the uploaded format.
+    """
+    max_size = settings.AI_VISION_IMAGE_MAX_SIZE
+    with Image.open(image_path) as img:
+        # JPEG files are decoded at the smallest scale still larger than max_size
+        img.draft('RGB', (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_size, max_size))
+        return encode_image(img, 'JPEG', settings.AI_VISION_IMAGE_QUALITY)
+
+
 class OpenAIClient:
     def __init__(self, default_language=None):
         self.client = OpenAI()
+        # created on first use by the async methods: it is bound to the event loop it is used in
+        self.async_client = None
         self.default_model = 'gpt-4-turbo-preview'
         self.vision_model = 'gpt-4-vision-preview'
         self.image_generation_model = 'dall-e-3'
@@ -25,13 +44,12 @@ class OpenAIClient:
         decoded_response = OpenAIClient.decode_response(response)
         return json.loads(decoded_response)
 
-    def plant_checker(self, plant_name: str):
+    def get_plant_checker_request(self, plant_name: str):
         """
-        Given a plant name, will call openai to generate a response on how to take care of the plant.
-        The response will be in JSON format and compliant with the pyPlants.models.Plant model.
+        Returns the chat completion parameters of the plant checker, shared by the sync and async clients.
         """
         print(f"Default language: {self.default_language}")
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.default_model,
             response_format={"type": "json_object"},
             messages=[
@@ -58,7 +76,19 @@ class OpenAIClient:
                 }
             ]
         )
-        return response
+
+    def plant_checker(self, plant_name: str):
+        """
+        Given a plant name, will call openai to generate a response on how to take care of the plant.
+        The response will be in JSON format and compliant with the pyPlants.models.Plant model.
+        """
+        return self.client.chat.completions.create(**self.get_plant_checker_request(plant_name))
+
+    async def aplant_checker(self, plant_name: str):
+        """
+        Async version of plant_checker.
+        """
+        return await self.get_async_client().chat.completions.create(**self.get_plant_checker_request(plant_name))
 
     def plant_recognizer(self, image_path: str):
         """
@@ -73,8 +103,7 @@ class OpenAIClient:
             raise ValueError("Error: File size exceeds 20 MB limit.")
 
         try:
-            with open(image_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+            encoded_string = base64.b64encode(prepare_vision_image(image_path)).decode('utf-8')
         except Exception as e:
             print(f"Error reading or encoding the image: {e}")
             raise e
@@ -98,7 +127,7 @@ class OpenAIClient:
                                 "text": "What is the name of this plant?"
                             },
                             {
-                                "type": "image",
+                                "type": "image_url",
                                 "image_url": {
                                     "url": f"data:image/jpeg;base64,{encoded_string}"
                                 }
@@ -112,11 +141,11 @@ class OpenAIClient:
             print(f"Error making request to OpenAI: {e}")
             raise e
 
-    def plant_image_generator(self, plant_name: str):
+    def get_plant_image_generator_request(self, plant_name: str):
         """
-        Given a plant name, will call openai to generate an image of the plant.
+        Returns the image generation parameters, shared by the sync and async clients.
         """
-        response = self.client.images.generate(
+        return dict(
             model=self.image_generation_model,
             prompt=f"A vibrant illustration of a {plant_name} plant, with a smooth, shiny finish and bright, popping colors. "
                    f"The plant should be centered within a circular badge that glows with a radiant light effect, giving a sense of premium quality. "
@@ -126,6 +155,28 @@ class OpenAIClient:
             quality="standard",
             n=1
         )
-        return response
 
+    def plant_image_generator(self, plant_name: str):
+        """
+        Given a plant name, will call openai to generate an image of the plant.
+        """
+        return self.client.images.generate(**self.get_plant_image_generator_request(plant_name))
 
+    async def aplant_image_generator(self, plant_name: str):
+        """
+        Async version of plant_image_generator.
+        """
+        return await self.get_async_client().images.generate(**self.get_plant_image_generator_request(plant_name))
+
+    def get_async_client(self):
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI()
+        return self.async_client
+
+    async def aclose(self):
+        """
+        Closes the async client: to be awaited before its event loop is closed.
+        """
+        if self.async_client is not None:
+            await self.async_client.close()
+            self.async_client = None
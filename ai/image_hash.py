@@ -0,0 +1,40 @@
+from PIL import Image, ImageOps
+
+
+# the difference hash is 64 bits: 8 rows of 8 comparisons between adjacent pixels
+HASH_SIZE = 8
+# the hash is indexed as 4 chunks of 16 bits, see PlantRecognizerCacheQuerySet.get_plant_name
+HASH_CHUNKS = 4
+HASH_CHUNK_BITS = HASH_SIZE * HASH_SIZE // HASH_CHUNKS
+
+
+def difference_hash(image_file) -> int:
+    """
+    Returns the 64 bits difference hash (dHash) of an image: for each pixel of a 9x8 grayscale thumbnail,
+    whether it is brighter than its right neighbour.
+    Re-encoded, resized or slightly edited copies of the same photo have the same hash, or a close one.
+    """
+    with Image.open(image_file) as img:
+        # JPEG files are decoded at a reduced scale, the full size image is never needed
+        img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+        img = ImageOps.exif_transpose(img)
+        pixels = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS).getdata()
+    image_hash = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            image_hash = (image_hash << 1) | (left > right)
+    return image_hash
+
+
+def hamming_distance(hash_1: int, hash_2: int) -> int:
+    return (hash_1 ^ hash_2).bit_count()
+
+
+def get_hash_chunks(image_hash: int) -> list[int]:
+    """Splits a hash into HASH_CHUNKS integers, from the most significant bits"""
+    mask = (1 << HASH_CHUNK_BITS) - 1
+    return [
+        (image_hash >> (HASH_CHUNK_BITS * (HASH_CHUNKS - 1 - index))) & mask for index in range(HASH_CHUNKS)
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_aiplantanswer_is_checking_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiplantanswer',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, help_text='Downsized copies of the image, by size and format', null=True),
+        ),
+    ]
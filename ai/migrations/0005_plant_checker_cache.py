@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_aiplantanswer_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantCheckerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('normalized_name', models.CharField(max_length=255)),
+                ('language', models.CharField(choices=[('EN', 'English'), ('FR', 'French')], max_length=2)),
+                ('json_answer', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0, help_text='Number of answers served from this entry')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='aiplantanswer',
+            name='from_cache',
+            field=models.BooleanField(default=False, help_text='Whether the answer was served from the cache, without calling OpenAI (not charged)'),
+        ),
+        migrations.AddConstraint(
+            model_name='plantcheckercache',
+            constraint=models.UniqueConstraint(fields=('normalized_name', 'language'), name='plant_checker_cache_name_language'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0005_plant_checker_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantRecognizerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('image_hash', models.CharField(help_text='Difference hash of the image (hexadecimal)', max_length=16)),
+                ('hash_chunk_0', models.PositiveIntegerField(db_index=True)),
+                ('hash_chunk_1', models.PositiveIntegerField(db_index=True)),
+                ('hash_chunk_2', models.PositiveIntegerField(db_index=True)),
+                ('hash_chunk_3', models.PositiveIntegerField(db_index=True)),
+                ('language', models.CharField(choices=[('EN', 'English'), ('FR', 'French')], max_length=2)),
+                ('plant_name', models.CharField(max_length=255)),
+                ('hits', models.PositiveIntegerField(default=0, help_text='Number of recognitions served from this entry')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='plantrecognizercache',
+            constraint=models.UniqueConstraint(fields=('image_hash', 'language'), name='plant_recognizer_cache_hash_language'),
+        ),
+    ]
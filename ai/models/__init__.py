@@ -1 +1,3 @@
 from .ai_plant_answer import AIPlantAnswer
+from .plant_checker_cache import PlantCheckerCache
+from .plant_recognizer_cache import PlantRecognizerCache
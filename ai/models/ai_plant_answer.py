@@ -1,4 +1,5 @@
 from django.db import models
+from pyPlants.events import EventTypes, publish_events_on_commit
 from pyPlants.models import Plant, AbstractPlantModel
 from pyPlants.utils import plant_logos_directory_path
 
@@ -15,8 +16,34 @@ class AIPlantAnswer(AbstractPlantModel):
     json_answer = models.JSONField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
     image = models.ImageField(null=True, blank=True, upload_to=plant_logos_directory_path)
+    image_derivatives = models.JSONField(null=True, blank=True, help_text='Downsized copies of the image, by size and format')
     is_checking_image = models.BooleanField(default=False)
     is_generating_image = models.BooleanField(default=False)
+    from_cache = models.BooleanField(
+        default=False, help_text='Whether the answer was served from the cache, without calling OpenAI (not charged)'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # deferred status: unknown
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        status = self.__dict__.get('status')
+        if status is not None and status != self._loaded_status:
+            # status changes are pushed to the plant's owner
+            self._loaded_status = status
+            publish_events_on_commit([(self.plant.user_id, EventTypes.AI_PLANT_ANSWER, self.get_event_data())])
+
+    def get_event_data(self):
+        return dict(id=self.id, plant=self.plant_id, status=self.status, error_message=self.error_message)
 
     def user(self):
         return self.plant.user.email
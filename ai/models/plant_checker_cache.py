@@ -0,0 +1,55 @@
+import re
+import unicodedata
+
+from django.db import models
+
+from ai.models.ttl_cache import TTLCacheQuerySet
+from pyPlants.models import AbstractPlantModel, PlantUser
+
+
+def normalize_plant_name(plant_name: str):
+    """Normalizes a plant name for the cache key: 'Monstera  Deliciosa ' and 'monstera deliciosa' are the same plant"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', plant_name)).strip().casefold()
+
+
+class PlantCheckerCacheQuerySet(TTLCacheQuerySet):
+    ttl_setting = 'AI_PLANT_CHECKER_CACHE_TTL'
+
+    def get_answer(self, plant_name: str, language: str):
+        """Returns the cached plant checker answer (json) of a plant in a language, None if missing or expired"""
+        entry = self.fresh().filter(
+            normalized_name=normalize_plant_name(plant_name), language=language
+        ).only('id', 'json_answer').first()
+        if entry is None:
+            return None
+        self.count_hit(entry)
+        return entry.json_answer
+
+    def store(self, plant_name: str, language: str, json_answer: dict):
+        """Stores (or refreshes) a validated plant checker answer"""
+        entry, _ = self.update_or_create(
+            normalized_name=normalize_plant_name(plant_name), language=language,
+            defaults=dict(json_answer=json_answer),
+        )
+        return entry
+
+
+class PlantCheckerCache(AbstractPlantModel):
+    """
+    Validated plant checker answers shared by all users, by plant name and language,
+    so that a plant already checked is not asked to OpenAI again.
+    """
+    normalized_name = models.CharField(max_length=255)
+    language = models.CharField(max_length=2, choices=PlantUser.LanguageChoices.choices)
+    json_answer = models.JSONField()
+    hits = models.PositiveIntegerField(default=0, help_text='Number of answers served from this entry')
+
+    objects = PlantCheckerCacheQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['normalized_name', 'language'], name='plant_checker_cache_name_language'),
+        ]
+
+    def __str__(self):
+        return f'{self.normalized_name} ({self.language})'
@@ -0,0 +1,74 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from ai.image_hash import get_hash_chunks, hamming_distance
+from ai.models.ttl_cache import TTLCacheQuerySet
+from pyPlants.models import AbstractPlantModel, PlantUser
+
+
+class PlantRecognizerCacheQuerySet(TTLCacheQuerySet):
+    ttl_setting = 'AI_PLANT_RECOGNIZER_CACHE_TTL'
+
+    def get_plant_name(self, image_hash: int, language: str):
+        """
+        Returns the plant name recognized from an image whose hash is within AI_PLANT_RECOGNIZER_HASH_THRESHOLD bits
+        of `image_hash` (the closest one), None if there is none.
+        Two hashes that differ by less than HASH_CHUNKS bits have at least one identical chunk: candidates are
+        selected on the indexed chunks, then compared on the whole hash.
+        """
+        threshold = settings.AI_PLANT_RECOGNIZER_HASH_THRESHOLD
+        candidates = self.fresh().filter(
+            reduce(or_, (Q(**{f'hash_chunk_{index}': chunk}) for index, chunk in enumerate(get_hash_chunks(image_hash)))),
+            language=language,
+        ).only('id', 'image_hash', 'plant_name')
+        matches = [
+            (distance, entry) for entry in candidates
+            if (distance := hamming_distance(int(entry.image_hash, 16), image_hash)) <= threshold
+        ]
+        if not matches:
+            return None
+        _, entry = min(matches, key=lambda match: match[0])
+        self.count_hit(entry)
+        return entry.plant_name
+
+    def store(self, image_hash: int, language: str, plant_name: str):
+        """Stores (or refreshes) the plant name recognized from an image"""
+        entry, _ = self.update_or_create(
+            image_hash=f'{image_hash:016x}', language=language,
+            defaults=dict(
+                plant_name=plant_name,
+                **{f'hash_chunk_{index}': chunk for index, chunk in enumerate(get_hash_chunks(image_hash))},
+            ),
+        )
+        return entry
+
+
+class PlantRecognizerCache(AbstractPlantModel):
+    """
+    Plant names recognized from images, by perceptual hash of the image and language,
+    so that a re-uploaded (or near-identical) photo is not sent to OpenAI again.
+    """
+    image_hash = models.CharField(max_length=16, help_text='Difference hash of the image (hexadecimal)')
+    # the hash split in its 4 chunks, to look up similar hashes through indexes
+    hash_chunk_0 = models.PositiveIntegerField(db_index=True)
+    hash_chunk_1 = models.PositiveIntegerField(db_index=True)
+    hash_chunk_2 = models.PositiveIntegerField(db_index=True)
+    hash_chunk_3 = models.PositiveIntegerField(db_index=True)
+    language = models.CharField(max_length=2, choices=PlantUser.LanguageChoices.choices)
+    plant_name = models.CharField(max_length=255)
+    hits = models.PositiveIntegerField(default=0, help_text='Number of recognitions served from this entry')
+
+    objects = PlantRecognizerCacheQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['image_hash', 'language'], name='plant_recognizer_cache_hash_language'),
+        ]
+
+    def __str__(self):
+        return f'{self.image_hash} ({self.language}): {self.plant_name}'
+
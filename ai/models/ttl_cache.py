@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class TTLCacheQuerySet(models.QuerySet):
+    """Cache entries that expire `ttl_setting` (name of the setting, in seconds) after their last update"""
+    ttl_setting = None
+
+    def get_expiry_limit(self):
+        return timezone.now() - timedelta(seconds=getattr(settings, self.ttl_setting))
+
+    def fresh(self):
+        """Entries updated less than the TTL ago"""
+        return self.filter(updated__gte=self.get_expiry_limit())
+
+    def expired(self):
+        return self.filter(updated__lt=self.get_expiry_limit())
+
+    def count_hit(self, entry):
+        # no save(): hits must not refresh the entry's TTL
+        self.filter(id=entry.id).update(hits=F('hits') + 1)
@@ -1,18 +1,50 @@
+import asyncio
+import contextlib
 import logging
+import tempfile
 
 from ai.client import OpenAIClient
 from pyPlants.constants import Seasons
+from pyPlants.image_derivatives import generate_image_derivatives
 from pyPlants.models import Plant
-from ai.models import AIPlantAnswer
+from ai.image_hash import difference_hash
+from ai.models import AIPlantAnswer, PlantCheckerCache, PlantRecognizerCache
 from ai.dataclass import PlantCheckerAnswer
 import requests
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files import File
 from celery import shared_task
 
 
 logger = logging.getLogger(__name__)
 
 
+def download_image(url):
+    """
+    Downloads an image into a temporary file, in chunks: the image is never held in memory.
+    Raises a requests.RequestException if the download fails, a ValueError if it exceeds AI_IMAGE_DOWNLOAD_MAX_SIZE.
+    """
+    max_size = settings.AI_IMAGE_DOWNLOAD_MAX_SIZE
+    image_file = tempfile.TemporaryFile()
+    try:
+        with requests.get(url, stream=True, timeout=settings.AI_IMAGE_DOWNLOAD_TIMEOUT) as response:
+            response.raise_for_status()
+            if int(response.headers.get('Content-Length') or 0) > max_size:
+                raise ValueError(f'Image exceeds {max_size} bytes')
+            size = 0
+            for chunk in response.iter_content(chunk_size=settings.AI_IMAGE_DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                # the announced length may be missing or wrong
+                if size > max_size:
+                    raise ValueError(f'Image exceeds {max_size} bytes')
+                image_file.write(chunk)
+    except Exception:
+        image_file.close()
+        raise
+    image_file.seek(0)
+    return image_file
+
+
 class PlantAIService:
     """
     Class that manages OpenAI plant recognition and instructions generation.
@@ -26,6 +58,7 @@ class PlantAIService:
         if user.has_reached_max_ai_usage():
             raise PermissionError('User has reached max AI usage (50)')
         self.client = OpenAIClient(default_language=user.get_default_language_display())
+        self.language = user.default_language
 
         if not ai_plant_answer:
             self.ai_plant_answer = AIPlantAnswer.objects.create(plant=self.plant)
@@ -51,7 +84,8 @@ class PlantAIService:
         """
         Gets the AI plant answer from the OpenAI API.
         It will first try to get the plant name from the image, if it doesn't have one.
-        Then based on the plant name, it will get the plant instructions.
+        Then based on the plant name, it will get the plant instructions and generate an image of the plant if it
+        doesn't have one, concurrently.
         Last, it will store the answer into the associated AIPlantAnswer object.
         In case of failure, it will raise an exception and store the failure message into the AIPlantAnswer object.
         """
@@ -59,45 +93,58 @@ class PlantAIService:
         # starts the process
         self.ai_plant_answer.status = AIPlantAnswer.StatusChoice.IN_PROGRESS
         self.ai_plant_answer.save()
+        used_openai = False
         try:
-            # try to get plant name from image
+            # try to get plant name from image, from the cache if a similar image was already recognized
             if not self.has_plant_name:
-                logger.info(f'Plant {self.plant.id} does not have name, trying to get it from image')
-                response = self.client.plant_recognizer(self.plant.image.path)
-                logger.info(f'Plant {self.plant.id} image recognition response: {response}')
-                decoded_response = self.client.decode_response(response)
-                logger.info(f'Plant {self.plant.id} image recognition decoded response: {decoded_response}')
-                if 'unknown' in decoded_response:
-                    logger.info(f'Plant {self.plant.id} could not be recognized from image')
-                    raise ValueError('Plant could not be recognized from image')
-                plant_name = decoded_response
-            # get plants instructions
-            logger.info(f'Getting plant instructions for {plant_name}')
-            response = self.client.plant_checker(plant_name)
-            logger.info(f'Plant instructions response: {response}')
-            decoded_response = self.client.decode_json_response(response)
-            logger.info(f'Plant instructions decoded response: {decoded_response}')
-            # check if response is valid
-            if 'error' in decoded_response:
-                logger.info(f'Plant name {plant_name} could not be recognized')
-                raise ValueError('Plant name could not be recognized')
-            # check if response is properly formatted
-            if not PlantCheckerAnswer.is_json_valid(decoded_response):
-                raise ValueError('Plant instructions are not properly formatted')
-            else:
+                image_hash = self.get_plant_image_hash()
+                if image_hash is not None:
+                    plant_name = PlantRecognizerCache.objects.get_plant_name(image_hash, self.language)
+                if plant_name:
+                    logger.info(f'Plant {self.plant.id} recognized as {plant_name} from cache')
+                else:
+                    logger.info(f'Plant {self.plant.id} does not have name, trying to get it from image')
+                    used_openai = True
+                    response = self.client.plant_recognizer(self.plant.image.path)
+                    logger.info(f'Plant {self.plant.id} image recognition response: {response}')
+                    decoded_response = self.client.decode_response(response)
+                    logger.info(f'Plant {self.plant.id} image recognition decoded response: {decoded_response}')
+                    if 'unknown' in decoded_response:
+                        logger.info(f'Plant {self.plant.id} could not be recognized from image')
+                        raise ValueError('Plant could not be recognized from image')
+                    plant_name = decoded_response
+                    if image_hash is not None:
+                        PlantRecognizerCache.objects.store(image_hash, self.language, plant_name)
+            # get plants instructions, from the cache if the plant was already checked
+            cached_answer = PlantCheckerCache.objects.get_answer(plant_name, self.language)
+            if cached_answer is not None:
+                logger.info(f'Plant instructions for {plant_name} served from cache')
+            # once the name is known, the instructions and the image generation are independent: they run concurrently
+            used_openai = used_openai or cached_answer is None or not self.has_plant_image
+            checker_response, image_file = asyncio.run(self.run_concurrent_stages(
+                plant_name, check_plant=cached_answer is None, generate_image=not self.has_plant_image
+            ))
+            # the downloaded image is closed (and deleted) whatever happens to the instructions
+            with image_file or contextlib.nullcontext():
+                try:
+                    decoded_response = cached_answer if cached_answer is not None else self.decode_plant_instructions(
+                        plant_name, checker_response
+                    )
+                except Exception:
+                    if image_file is not None:
+                        logger.warning(f'Image generated for {plant_name} discarded: the plant instructions failed')
+                    raise
                 plant_checker_answer = PlantCheckerAnswer.from_json_answer(decoded_response, plant_name)
                 self.ai_plant_answer.json_answer = plant_checker_answer.to_json()
+                # no OpenAI call at all: the answer is not charged
+                self.ai_plant_answer.from_cache = not used_openai
                 self.ai_plant_answer.save()
-            # Generate an image of the plant if it doesn't have one
-            if not self.has_plant_image:
-                response = self.client.plant_image_generator(plant_name)
-                # omitting decoding for now
-                url = response.data[0].url
-                image_response = requests.get(url)
-                if image_response.status_code == 200:
+                if image_file is not None:
+                    # copied to the storage in chunks, from the downloaded temporary file
                     image_name = f'{plant_name}.png'
-                    image_file = ContentFile(image_response.content, name=image_name)
-                    self.ai_plant_answer.image.save(image_name, image_file, save=True)
+                    self.ai_plant_answer.image.save(image_name, File(image_file, name=image_name), save=True)
+            if image_file is not None:
+                self.generate_image_derivatives()
         except Exception as ex:
             self.ai_plant_answer.status = AIPlantAnswer.StatusChoice.FAILURE
             self.ai_plant_answer.error_message = str(ex)
@@ -110,6 +157,98 @@ class PlantAIService:
         finally:
             return self.ai_plant_answer.status
 
+    def decode_plant_instructions(self, plant_name, checker_response):
+        """
+        Decodes and validates the plant checker response, then stores it in the cache.
+        """
+        logger.info(f'Plant instructions response: {checker_response}')
+        decoded_response = self.client.decode_json_response(checker_response)
+        logger.info(f'Plant instructions decoded response: {decoded_response}')
+        # check if response is valid
+        if 'error' in decoded_response:
+            logger.info(f'Plant name {plant_name} could not be recognized')
+            raise ValueError('Plant name could not be recognized')
+        # check if response is properly formatted
+        if not PlantCheckerAnswer.is_json_valid(decoded_response):
+            raise ValueError('Plant instructions are not properly formatted')
+        PlantCheckerCache.objects.store(plant_name, self.language, {
+            key: decoded_response[key] for key in PlantCheckerAnswer.plant_checker_keys()
+        })
+        return decoded_response
+
+    async def run_concurrent_stages(self, plant_name, check_plant=True, generate_image=True):
+        """
+        Runs the plant checker and the image generation (with its download) concurrently, with the async client.
+        Returns the plant checker response and the generated image, as a temporary file (None for the stages not run).
+        If a stage fails, its error is raised once both stages are done (a generated image is then discarded).
+        No database access here: the results are stored by the caller, in sync code.
+        """
+        # bounds the OpenAI requests of this answer: each answer runs in its own event loop (asyncio.run)
+        request_slots = asyncio.Semaphore(settings.AI_MAX_CONCURRENT_REQUESTS)
+
+        async def skipped():
+            return None
+
+        async def check_plant_stage():
+            async with request_slots:
+                return await self.client.aplant_checker(plant_name)
+
+        try:
+            checker_response, image_file = await asyncio.gather(
+                check_plant_stage() if check_plant else skipped(),
+                self.generate_plant_image(plant_name, request_slots) if generate_image else skipped(),
+                return_exceptions=True,
+            )
+        finally:
+            await self.client.aclose()
+        if isinstance(checker_response, Exception):
+            if image_file is not None and not isinstance(image_file, Exception):
+                image_file.close()
+                logger.warning(f'Image generated for {plant_name} discarded: the plant instructions failed')
+            raise checker_response
+        if isinstance(image_file, Exception):
+            raise image_file
+        return checker_response, image_file
+
+    async def generate_plant_image(self, plant_name, request_slots):
+        """
+        Generates an image of the plant and returns it as a temporary file, None if it could not be downloaded.
+        The OpenAI request waits for one of the `request_slots` (asyncio.Semaphore).
+        """
+        logger.info(f'Generating an image for {plant_name}')
+        async with request_slots:
+            response = await self.client.aplant_image_generator(plant_name)
+        # omitting decoding for now
+        url = response.data[0].url
+        try:
+            return await asyncio.to_thread(download_image, url)
+        except (requests.RequestException, ValueError) as ex:
+            logger.warning(f'Could not download the image generated for {plant_name}: {ex}')
+            return None
+
+    def get_plant_image_hash(self):
+        """
+        Returns the perceptual hash of the plant image, used to look up the recognition cache.
+        A failure is not fatal: the image is sent to OpenAI, which reports images it cannot read.
+        """
+        try:
+            with self.plant.image.open('rb'):
+                return difference_hash(self.plant.image)
+        except Exception as ex:
+            logger.warning(f'Could not hash the image of plant {self.plant.id}: {ex}')
+            return None
+
+    def generate_image_derivatives(self):
+        """
+        Generates the downsized copies of the generated image.
+        A failure is not fatal: clients fall back on the full size image.
+        """
+        try:
+            self.ai_plant_answer.image_derivatives = generate_image_derivatives(self.ai_plant_answer.image)
+            self.ai_plant_answer.save()
+        except Exception as ex:
+            logger.exception(f'Could not generate image derivatives for AI plant answer {self.ai_plant_answer.id}: {ex}')
+
     def update_plant_from_ai_plant_answer(self):
         """
         Updates the plant from the AIPlantAnswer object.
@@ -129,7 +268,8 @@ class PlantAIService:
         self.plant.repotting_season = getattr(Seasons, plant_checker_answer.repotting_season.upper())
         self.plant.leaf_mist = plant_checker_answer.leaf_mist
         self.plant.extra_tips = plant_checker_answer.extra_tips
-        self.plant.save()
         if self.ai_plant_answer.image.name:
-            self.plant.image.save(self.ai_plant_answer.image.name, self.ai_plant_answer.image, save=True)
+            # the plant shares the generated image and its derivatives
+            self.plant.link_processed_image(self.ai_plant_answer.image, self.ai_plant_answer.image_derivatives)
+        self.plant.save()
         return self.plant
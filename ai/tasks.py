@@ -2,6 +2,7 @@ from celery import shared_task
 
 from ai.models import AIPlantAnswer
 from ai.service import PlantAIService
+from pyPlants.image_derivatives import generate_image_derivatives
 from pyPlants.models import Plant
 
 
@@ -12,3 +13,14 @@ def get_ai_plant_answer_task(plant_id, ai_plant_answer_id):
     service = PlantAIService(plant=plant, ai_plant_answer=ai_plant_answer)
     res = service.get_ai_plant_answer()
     return res
+
+
+@shared_task(name='generate_ai_plant_answer_image_derivatives_task')
+def generate_ai_plant_answer_image_derivatives_task(ai_plant_answer_id):
+    """Generates the derivatives of an AI plant answer image that has none (e.g. generated before derivatives existed)"""
+    ai_plant_answer = AIPlantAnswer.objects.filter(id=ai_plant_answer_id).first()
+    if ai_plant_answer is None or not ai_plant_answer.image or ai_plant_answer.image_derivatives:
+        return None
+    ai_plant_answer.image_derivatives = generate_image_derivatives(ai_plant_answer.image)
+    ai_plant_answer.save(update_fields=['image_derivatives', 'updated'])
+    return ai_plant_answer.image_derivatives
@@ -0,0 +1,58 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image
+from django.test import TestCase, tag
+
+from ai.client import OpenAIClient, prepare_vision_image
+
+
+@tag('openai-client')
+class PrepareVisionImageTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def build_image(self, name, size, mode='RGB', orientation=None):
+        path = os.path.join(self.directory, name)
+        exif = Image.Exif()
+        if orientation:
+            exif[0x0112] = orientation
+        Image.new(mode, size, color='green' if mode == 'RGB' else None).save(path, exif=exif)
+        return path
+
+    def test_downscaled_jpeg(self):
+        image = prepare_vision_image(self.build_image('plant.jpg', (4032, 3024)))
+        with Image.open(io.BytesIO(image)) as img:
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, (1024, 768))
+
+    def test_exif_rotation(self):
+        # orientation 6: rotated 90° clockwise
+        image = prepare_vision_image(self.build_image('plant.jpg', (4032, 3024), orientation=6))
+        with Image.open(io.BytesIO(image)) as img:
+            self.assertEqual(img.size, (768, 1024))
+
+    def test_small_png(self):
+        image = prepare_vision_image(self.build_image('plant.png', (300, 200), mode='RGBA'))
+        with Image.open(io.BytesIO(image)) as img:
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, (300, 200))
+
+    @patch('ai.client.OpenAI')
+    def test_plant_recognizer_payload(self, openai_mock):
+        OpenAIClient().plant_recognizer(self.build_image('plant.png', (2048, 2048), mode='RGBA'))
+        messages = openai_mock.return_value.chat.completions.create.call_args.kwargs['messages']
+        image_content = messages[1]['content'][1]
+        self.assertEqual(image_content['type'], 'image_url')
+        prefix = 'data:image/jpeg;base64,'
+        self.assertTrue(image_content['image_url']['url'].startswith(prefix))
+        image = base64.b64decode(image_content['image_url']['url'][len(prefix):])
+        with Image.open(io.BytesIO(image)) as img:
+            self.assertEqual(img.size, (1024, 1024))
@@ -0,0 +1,97 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from django.test import TestCase, tag
+from freezegun import freeze_time
+
+from ai.models import AIPlantAnswer, PlantCheckerCache
+from ai.models.plant_checker_cache import normalize_plant_name
+from ai.service import PlantAIService
+from pyPlants.models import PlantUser, Plant
+
+
+PLANT_CHECKER_ANSWER = {
+    'description': 'A tropical plant',
+    'water_frequency_summer': 7,
+    'water_frequency_winter': 14,
+    'sunlight': 'partial_shade',
+    'sun_exposure': 'no_direct_sun',
+    'fertilizer': True,
+    'fertilizer_season': 'spring',
+    'repotting': True,
+    'repotting_season': 'spring',
+    'leaf_mist': True,
+    'extra_tips': 'Keep it away from cold drafts',
+}
+
+
+def get_completion(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+@tag('plant-checker-cache')
+@patch('ai.service.OpenAIClient')
+class PlantCheckerCacheTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com',
+            has_ai_enabled=True,
+        )
+        self.plant = Plant.objects.create(name='Monstera', user=self.user, image='plant_pictures/monstera.jpg')
+
+    def run_ai_check(self, client_mock, plant):
+        client_mock.return_value.aplant_checker = AsyncMock(
+            return_value=get_completion(json.dumps(PLANT_CHECKER_ANSWER))
+        )
+        client_mock.return_value.aclose = AsyncMock()
+        client_mock.return_value.decode_json_response.side_effect = lambda response: json.loads(
+            response.choices[0].message.content
+        )
+        return PlantAIService(plant=plant).get_ai_plant_answer()
+
+    def test_normalize_plant_name(self, client_mock):
+        self.assertEqual(normalize_plant_name('  Monstera   Deliciosa '), 'monstera deliciosa')
+
+    def test_cache_miss_then_hit(self, client_mock):
+        self.assertEqual(self.run_ai_check(client_mock, self.plant), AIPlantAnswer.StatusChoice.SUCCESS)
+        client_mock.return_value.aplant_checker.assert_called_once_with('Monstera')
+        self.assertEqual(PlantCheckerCache.objects.count(), 1)
+        self.assertEqual(self.user.current_ai_usage(), 1)
+
+        other_user = PlantUser.objects.create_user(email='bar@foo.com', has_ai_enabled=True)
+        other_plant = Plant.objects.create(name='monstera ', user=other_user, image='plant_pictures/monstera.jpg')
+        client_mock.reset_mock()
+        self.assertEqual(self.run_ai_check(client_mock, other_plant), AIPlantAnswer.StatusChoice.SUCCESS)
+        client_mock.return_value.aplant_checker.assert_not_called()
+        ai_plant_answer = AIPlantAnswer.objects.get(plant=other_plant)
+        self.assertTrue(ai_plant_answer.from_cache)
+        self.assertEqual(ai_plant_answer.json_answer['name'], 'monstera ')
+        self.assertEqual(ai_plant_answer.json_answer['water_frequency_summer'], 7)
+        # served from the cache: not charged
+        self.assertEqual(other_user.current_ai_usage(), 0)
+        self.assertEqual(PlantCheckerCache.objects.get().hits, 1)
+
+    def test_cache_by_language(self, client_mock):
+        self.run_ai_check(client_mock, self.plant)
+        french_user = PlantUser.objects.create_user(
+            email='bar@foo.com', has_ai_enabled=True, default_language=PlantUser.LanguageChoices.FRENCH
+        )
+        plant = Plant.objects.create(name='Monstera', user=french_user, image='plant_pictures/monstera.jpg')
+        client_mock.reset_mock()
+        self.run_ai_check(client_mock, plant)
+        client_mock.return_value.aplant_checker.assert_called_once()
+        self.assertEqual(PlantCheckerCache.objects.count(), 2)
+
+    def test_cache_expired(self, client_mock):
+        self.run_ai_check(client_mock, self.plant)
+        client_mock.reset_mock()
+        with freeze_time(PlantCheckerCache.objects.get().updated + timedelta(days=31)):
+            self.assertEqual(PlantCheckerCache.objects.expired().count(), 1)
+            self.run_ai_check(client_mock, Plant.objects.create(
+                name='Monstera', user=self.user, image='plant_pictures/monstera.jpg'
+            ))
+        client_mock.return_value.aplant_checker.assert_called_once()
+        self.assertEqual(PlantCheckerCache.objects.expired().count(), 0)
@@ -0,0 +1,111 @@
+import io
+import json
+import shutil
+import tempfile
+from unittest.mock import patch, AsyncMock
+
+from PIL import Image, ImageDraw
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, tag, override_settings
+
+from ai.image_hash import difference_hash, hamming_distance, get_hash_chunks
+from ai.models import AIPlantAnswer, PlantRecognizerCache
+from ai.service import PlantAIService
+from ai.tests.test_plant_checker_cache import PLANT_CHECKER_ANSWER, get_completion
+from pyPlants.models import PlantUser, Plant
+
+
+def build_image(size=(1024, 768), quality=90, mirror=False):
+    img = Image.new('RGB', size, color='white')
+    draw = ImageDraw.Draw(img)
+    width, height = size
+    for index in range(8):
+        draw.ellipse(
+            (index * width // 10, index * height // 12, (index + 3) * width // 10, (index + 4) * height // 12),
+            fill=(20 * index, 120 + 15 * index, 40),
+        )
+    if mirror:
+        img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality)
+    return SimpleUploadedFile('plant.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@tag('plant-recognizer-cache')
+class ImageHashTest(TestCase):
+    def test_similar_images(self):
+        image_hash = difference_hash(build_image())
+        self.assertLessEqual(hamming_distance(image_hash, difference_hash(build_image(size=(512, 384), quality=60))), 3)
+        self.assertGreater(hamming_distance(image_hash, difference_hash(build_image(mirror=True))), 3)
+
+    def test_hash_chunks(self):
+        self.assertEqual(get_hash_chunks(0x0123456789abcdef), [0x0123, 0x4567, 0x89ab, 0xcdef])
+
+    def test_get_plant_name(self):
+        PlantRecognizerCache.objects.store(0x0123456789abcdef, PlantUser.LanguageChoices.ENGLISH, 'Monstera')
+        # 3 bits away, in 3 different chunks
+        self.assertEqual(
+            PlantRecognizerCache.objects.get_plant_name(0x1123556789abcdee, PlantUser.LanguageChoices.ENGLISH),
+            'Monstera'
+        )
+        # 4 bits away
+        self.assertIsNone(
+            PlantRecognizerCache.objects.get_plant_name(0x1123556789abcdec, PlantUser.LanguageChoices.ENGLISH)
+        )
+        self.assertIsNone(
+            PlantRecognizerCache.objects.get_plant_name(0x0123456789abcdef, PlantUser.LanguageChoices.FRENCH)
+        )
+        self.assertEqual(PlantRecognizerCache.objects.get().hits, 1)
+
+
+@tag('plant-recognizer-cache')
+@patch('ai.service.OpenAIClient')
+class PlantRecognizerCacheServiceTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com',
+            has_ai_enabled=True,
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def run_ai_check(self, client_mock, image):
+        plant = Plant.objects.create(user=self.user, image=image)
+        client_mock.return_value.plant_recognizer.return_value = get_completion('Monstera')
+        client_mock.return_value.aplant_checker = AsyncMock(
+            return_value=get_completion(json.dumps(PLANT_CHECKER_ANSWER))
+        )
+        client_mock.return_value.aclose = AsyncMock()
+        client_mock.return_value.decode_response.side_effect = lambda response: response.choices[0].message.content
+        client_mock.return_value.decode_json_response.side_effect = lambda response: json.loads(
+            response.choices[0].message.content
+        )
+        self.assertEqual(PlantAIService(plant=plant).get_ai_plant_answer(), AIPlantAnswer.StatusChoice.SUCCESS)
+        return AIPlantAnswer.objects.get(plant=plant)
+
+    def test_similar_image_recognized_from_cache(self, client_mock):
+        ai_plant_answer = self.run_ai_check(client_mock, build_image())
+        client_mock.return_value.plant_recognizer.assert_called_once()
+        self.assertFalse(ai_plant_answer.from_cache)
+        self.assertEqual(PlantRecognizerCache.objects.get().plant_name, 'Monstera')
+
+        client_mock.reset_mock()
+        ai_plant_answer = self.run_ai_check(client_mock, build_image(size=(512, 384), quality=60))
+        client_mock.return_value.plant_recognizer.assert_not_called()
+        client_mock.return_value.aplant_checker.assert_not_called()
+        self.assertEqual(ai_plant_answer.json_answer['name'], 'Monstera')
+        # neither the recognition nor the instructions were asked to OpenAI
+        self.assertTrue(ai_plant_answer.from_cache)
+        self.assertEqual(self.user.current_ai_usage(), 1)
+
+    def test_different_image_not_recognized_from_cache(self, client_mock):
+        self.run_ai_check(client_mock, build_image())
+        client_mock.reset_mock()
+        self.run_ai_check(client_mock, build_image(mirror=True))
+        client_mock.return_value.plant_recognizer.assert_called_once()
+        self.assertEqual(PlantRecognizerCache.objects.count(), 2)
@@ -0,0 +1,153 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from PIL import Image
+from django.conf import settings
+from django.test import TestCase, tag, override_settings
+
+from ai.models import AIPlantAnswer
+from ai.service import PlantAIService
+from ai.tests.test_plant_checker_cache import PLANT_CHECKER_ANSWER, get_completion
+from pyPlants.models import PlantUser, Plant
+
+
+@tag('ai-service')
+@patch('ai.service.requests.get')
+@patch('ai.service.OpenAIClient')
+class PlantAIServiceConcurrencyTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com',
+            has_ai_enabled=True,
+        )
+        self.plant = Plant.objects.create(name='Monstera', user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def mock_client(self, client_mock, get_mock):
+        both_started = asyncio.Event()
+        started = []
+        self.concurrent_stages = []
+
+        async def wait_for_other_stage(name):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            # times out if the stages run one after the other
+            try:
+                await asyncio.wait_for(both_started.wait(), timeout=0.5)
+            except TimeoutError:
+                return
+            self.concurrent_stages.append(name)
+
+        async def plant_checker(plant_name):
+            await wait_for_other_stage('plant_checker')
+            return get_completion(json.dumps(PLANT_CHECKER_ANSWER))
+
+        async def plant_image_generator(plant_name):
+            await wait_for_other_stage('plant_image_generator')
+            response = MagicMock()
+            response.data[0].url = 'https://images.openai.com/monstera.png'
+            return response
+
+        client = client_mock.return_value
+        client.aplant_checker = AsyncMock(side_effect=plant_checker)
+        client.aplant_image_generator = AsyncMock(side_effect=plant_image_generator)
+        client.aclose = AsyncMock()
+        client.decode_json_response.side_effect = lambda response: json.loads(response.choices[0].message.content)
+        get_mock.return_value.__enter__.return_value = self.build_image_response()
+        return client
+
+    @staticmethod
+    def build_image_response(size=(256, 256)):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, color='green').save(buffer, format='PNG')
+        content = buffer.getvalue()
+        response = MagicMock(headers={'Content-Length': str(len(content))})
+        response.iter_content.side_effect = lambda chunk_size: (
+            content[index:index + chunk_size] for index in range(0, len(content), chunk_size)
+        )
+        return response
+
+    def test_stages_run_concurrently(self, client_mock, get_mock):
+        client = self.mock_client(client_mock, get_mock)
+        self.assertEqual(PlantAIService(plant=self.plant).get_ai_plant_answer(), AIPlantAnswer.StatusChoice.SUCCESS)
+        client.aplant_checker.assert_awaited_once_with('Monstera')
+        client.aplant_image_generator.assert_awaited_once_with('Monstera')
+        self.assertCountEqual(self.concurrent_stages, ['plant_checker', 'plant_image_generator'])
+        get_mock.assert_called_once_with(
+            'https://images.openai.com/monstera.png', stream=True, timeout=settings.AI_IMAGE_DOWNLOAD_TIMEOUT
+        )
+        client.aclose.assert_awaited_once()
+        ai_plant_answer = AIPlantAnswer.objects.get(plant=self.plant)
+        self.assertEqual(ai_plant_answer.json_answer['water_frequency_summer'], 7)
+        self.assertFalse(ai_plant_answer.from_cache)
+        self.assertTrue(ai_plant_answer.image.name.endswith('.png'))
+        self.assertIsNotNone(ai_plant_answer.image_derivatives)
+
+    def test_stage_failure(self, client_mock, get_mock):
+        client = self.mock_client(client_mock, get_mock)
+        client.aplant_image_generator.side_effect = ValueError('Image generation failed')
+        self.assertEqual(PlantAIService(plant=self.plant).get_ai_plant_answer(), AIPlantAnswer.StatusChoice.FAILURE)
+        ai_plant_answer = AIPlantAnswer.objects.get(plant=self.plant)
+        self.assertEqual(ai_plant_answer.error_message, 'Image generation failed')
+        client.aclose.assert_awaited_once()
+
+    @patch('ai.service.download_image')
+    def test_image_discarded_on_invalid_instructions(self, download_image_mock, client_mock, get_mock):
+        client = self.mock_client(client_mock, get_mock)
+        image_file = tempfile.TemporaryFile()
+        download_image_mock.return_value = image_file
+        client.decode_json_response.side_effect = lambda response: dict(error='unknown plant')
+        with self.assertLogs('ai.service', level='WARNING') as logs:
+            status = PlantAIService(plant=self.plant).get_ai_plant_answer()
+        self.assertEqual(status, AIPlantAnswer.StatusChoice.FAILURE)
+        self.assertTrue(image_file.closed)
+        self.assertIn('Image generated for Monstera discarded', logs.output[0])
+        self.assertFalse(AIPlantAnswer.objects.get(plant=self.plant).image)
+
+    @patch('ai.service.download_image')
+    def test_image_discarded_on_checker_failure(self, download_image_mock, client_mock, get_mock):
+        client = self.mock_client(client_mock, get_mock)
+        image_file = tempfile.TemporaryFile()
+        download_image_mock.return_value = image_file
+        client.aplant_checker.side_effect = ValueError('OpenAI is down')
+        with self.assertLogs('ai.service', level='WARNING') as logs:
+            status = PlantAIService(plant=self.plant).get_ai_plant_answer()
+        self.assertEqual(status, AIPlantAnswer.StatusChoice.FAILURE)
+        self.assertEqual(AIPlantAnswer.objects.get(plant=self.plant).error_message, 'OpenAI is down')
+        self.assertTrue(image_file.closed)
+        self.assertIn('Image generated for Monstera discarded', logs.output[0])
+
+    @override_settings(AI_IMAGE_DOWNLOAD_MAX_SIZE=100)
+    def test_download_size_limit(self, client_mock, get_mock):
+        self.mock_client(client_mock, get_mock)
+        # the announced length is missing: the limit is checked while streaming
+        get_mock.return_value.__enter__.return_value.headers = dict()
+        self.assertEqual(PlantAIService(plant=self.plant).get_ai_plant_answer(), AIPlantAnswer.StatusChoice.SUCCESS)
+        self.assertFalse(AIPlantAnswer.objects.get(plant=self.plant).image)
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_plant_linked_to_generated_image(self, process_mock, client_mock, get_mock):
+        self.mock_client(client_mock, get_mock)
+        PlantAIService(plant=self.plant).get_ai_plant_answer()
+        ai_plant_answer = AIPlantAnswer.objects.get(plant=self.plant)
+        with self.captureOnCommitCallbacks(execute=True):
+            PlantAIService(plant=self.plant, ai_plant_answer=ai_plant_answer).update_plant_from_ai_plant_answer()
+        plant = Plant.objects.get(id=self.plant.id)
+        # the same stored file, already processed
+        self.assertEqual(plant.image.name, ai_plant_answer.image.name)
+        self.assertEqual(plant.image_derivatives, ai_plant_answer.image_derivatives)
+        self.assertEqual(plant.image_status, Plant.ImageStatusOptions.READY)
+        process_mock.assert_not_called()
+        self.assertEqual(len(os.listdir(os.path.dirname(plant.image.path))), 1 + 2 * 3)
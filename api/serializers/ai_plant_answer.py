@@ -1,9 +1,14 @@
 from rest_framework import serializers
 from ai.models import AIPlantAnswer
+from pyPlants.image_derivatives import get_image_derivative_urls
 
 
 class AIPlantAnswerSerializer(serializers.ModelSerializer):
+    image_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = AIPlantAnswer
-        fields = '__all__'
+        exclude = ('image_derivatives',)
+
+    def get_image_urls(self, obj):
+        return get_image_derivative_urls(obj.image, obj.image_derivatives, request=self.context.get('request'))
@@ -6,5 +6,5 @@ class NotificationCenterSerializer(serializers.ModelSerializer):
     class Meta:
         model = NotificationCenter
         fields = ['enable_in_app_notifications', 'enable_email_notifications', 'enable_sms_notifications',
-                  'preferred_notification_hour', 'last_notification_sent']
-        read_only_fields = ['last_notification_sent']
+                  'preferred_notification_hour', 'last_notification_sent', 'unread_notifications_count']
+        read_only_fields = ['last_notification_sent', 'unread_notifications_count']
@@ -1,14 +1,16 @@
 from rest_framework import serializers
+from pyPlants.image_derivatives import get_image_derivative_urls
 from pyPlants.models import Plant
 
 
 class PlantSerializer(serializers.ModelSerializer):
     water_frequency = serializers.SerializerMethodField()
+    image_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = Plant
-        fields = '__all__'
-        read_only_fields = ('user', 'is_complete', 'needs_care')
+        exclude = ('image_derivatives',)
+        read_only_fields = ('user', 'is_complete', 'needs_care', 'image_status')
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -17,3 +19,32 @@ class PlantSerializer(serializers.ModelSerializer):
 
     def get_water_frequency(self, obj):
         return obj.get_water_frequency()
+
+    def get_image_urls(self, obj):
+        return get_image_derivative_urls(obj.image, obj.image_derivatives, request=self.context.get('request'))
+
+
+class BulkCareActionSerializer(serializers.Serializer):
+    plant = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=Plant.care_actions)
+
+
+class BulkCareSerializer(serializers.Serializer):
+    actions = BulkCareActionSerializer(many=True, allow_empty=False, max_length=100)
+
+
+class PlantCareStateSerializer(serializers.ModelSerializer):
+    """Compact care state of a plant, returned by the bulk care action"""
+    needs_care = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Plant
+        fields = (
+            'id', 'last_watered', 'last_fertilized', 'last_repotted',
+            'next_water_date', 'should_water', 'next_fertilize_date', 'should_fertilize',
+            'next_repotting_date', 'should_repot', 'needs_care',
+        )
+
+    def get_needs_care(self, obj):
+        # needs_care is generated by the database: compute it from the in-memory flags instead of reloading the plant
+        return obj.should_water or obj.should_fertilize or obj.should_repot
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from api.views.events import EventStreamView
 from api.views.login import CustomAuthToken
 from api.views.notification import NotificationModelViewSet
 from api.views.notification_center import NotificationCenterViews
@@ -24,4 +25,5 @@ urlpatterns = [
     path('user/', UserView.as_view(), name='user'),
     path('user/change-password/', ChangePasswordView.as_view(), name='user-change-password'),
     path('notification-center/', NotificationCenterViews.as_view(), name='notification-center'),
+    path('events/', EventStreamView.as_view(), name='events'),
 ]
@@ -0,0 +1,57 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse, JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from pyPlants.events import subscribe
+
+
+def format_event(event):
+    """Formats an event ({type, data}) as a server-sent event, or a keep-alive comment for None"""
+    if event is None:
+        return ': keep-alive\n\n'
+    return f'event: {event["type"]}\ndata: {json.dumps(event["data"])}\n\n'
+
+
+@sync_to_async
+def authenticate(request):
+    """Authenticates the request with the API authentication classes (JWT), returns the user or None"""
+    authenticators = [authentication_class() for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        user = Request(request, authenticators=authenticators).user
+    except APIException:
+        return None
+    return user if user.is_authenticated else None
+
+
+class EventStreamView(View):
+    """
+    Server-sent events stream of the user: new in-app notifications and AI plant answers status changes.
+    The stream is closed after EVENTS_STREAM_TIMEOUT seconds, clients reconnect (after `retry` milliseconds).
+    Async: the server must run the ASGI application (pyPlants.asgi), an open stream then only holds a coroutine.
+    Authenticated like the rest of the API (Authorization: Bearer <token>): browsers' EventSource can't set headers,
+    clients stream the response with fetch.
+    """
+    async def get(self, request):
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse(
+                dict(detail='Authentication credentials were not provided or are invalid.'), status=401,
+                headers={'WWW-Authenticate': 'Bearer realm="api"'},
+            )
+
+        async def stream():
+            yield f'retry: {settings.EVENTS_HEARTBEAT_INTERVAL * 1000}\n\n'
+            async for event in subscribe(user.id):
+                yield format_event(event)
+
+        response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # no buffering by nginx
+        response['X-Accel-Buffering'] = 'no'
+        return response
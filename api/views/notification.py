@@ -5,8 +5,8 @@ from rest_framework.response import Response
 
 from django_filters import rest_framework as dj_filters
 
-from api.serializers.notification import NotificationSerializer
-from pyPlants.models import Notification
+from api.serializers.notification import NotificationSerializer, NotificationIdsSerializer
+from pyPlants.models import Notification, NotificationCenter
 
 
 class NotificationModelViewSet(viewsets.ModelViewSet):
@@ -26,6 +26,25 @@ class NotificationModelViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(notification, many=False)
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=['post'], detail=False, url_path='mark-all-viewed')
+    def mark_all_viewed(self, request):
+        marked_count = self.get_queryset().mark_as_viewed()
+        return Response(data=dict(count=marked_count), status=status.HTTP_200_OK)
+
+    @action(methods=['post'], detail=False, url_path='mark-viewed')
+    def mark_viewed(self, request):
+        serializer = NotificationIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked_count = self.get_queryset().filter(id__in=serializer.validated_data['ids']).mark_as_viewed()
+        return Response(data=dict(count=marked_count), status=status.HTTP_200_OK)
+
+    @action(methods=['get'], detail=False, url_path='unread-count')
+    def unread_count(self, request):
+        unread_count = NotificationCenter.objects.filter(user=request.user).values_list(
+            'unread_notifications_count', flat=True
+        ).first()
+        return Response(data=dict(unread_count=unread_count or 0), status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         raise MethodNotAllowed("POST", detail="Creation not allowed.")
 
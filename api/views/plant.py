@@ -8,7 +8,7 @@ from ai.models import AIPlantAnswer
 from ai.service import PlantAIService
 from ai.tasks import get_ai_plant_answer_task
 from api.serializers.ai_plant_answer import AIPlantAnswerSerializer
-from api.serializers.plant import PlantSerializer
+from api.serializers.plant import PlantSerializer, BulkCareSerializer, PlantCareStateSerializer
 from api.utils import CustomPagination
 from pyPlants.models import Plant
 
@@ -71,6 +71,20 @@ class PlantModelViewSet(viewsets.ModelViewSet):
         except ValueError as err:
             return Response(data={'error': str(err)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(methods=['post'], detail=False, url_path='bulk-care')
+    def bulk_care(self, request):
+        serializer = BulkCareSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        actions = [(item['plant'], item['action']) for item in serializer.validated_data['actions']]
+        try:
+            plants = self.get_queryset().bulk_care(actions)
+        except Plant.DoesNotExist as err:
+            return Response(data={'error': str(err)}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as err:
+            return Response(data={'error': str(err)}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = PlantCareStateSerializer(plants, many=True)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
     @action(methods=['post'], detail=True)
     def ai_check(self, request, pk=None):
         plant = self.get_object()
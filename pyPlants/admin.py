@@ -19,7 +19,7 @@ class NotificationCenterAdmin(admin.ModelAdmin):
 
 
 class PlantAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'user', 'is_complete', 'sun_exposure', 'water_frequency_summer',
+    list_display = ('id', 'name', 'user', 'is_complete', 'image_status', 'sun_exposure', 'water_frequency_summer',
                     'water_frequency_winter', 'last_watered', 'leaf_mist',
                     'fertilizer', 'fertilizer_season', 'last_fertilized',
                     'repotting', 'repotting_season', 'last_repotted')
@@ -36,9 +36,10 @@ class PlantAdmin(admin.ModelAdmin):
 
 
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'user', 'created', 'notification_type', 'sent', 'viewed', 'sent_at', 'viewed_at')
+    list_display = ('pk', 'user', 'created', 'notification_type', 'sent', 'viewed', 'sent_at', 'viewed_at',
+                    'delivery_status', 'delivery_attempts')
     search_fields = ['user', 'message']
-    list_filter = ['sent', 'viewed']
+    list_filter = ['sent', 'viewed', 'delivery_status']
 
 
 admin.site.register(PlantUser, PlantUserAdmin)
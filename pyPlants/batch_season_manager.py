@@ -0,0 +1,158 @@
+import datetime
+import logging
+
+import numpy as np
+
+from .constants import Seasons
+from .season_manager import SEASONS, SEASON_CALENDAR, HALF_YEAR_CALENDAR, SEASON_BOUNDS, _MONTH_OFFSETS
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seasons are handled as integer codes in arrays
+SEASON_CODES = {season: code for code, season in enumerate(SEASONS)}
+INVALID_SEASON = -1
+
+_MONTH_OFFSETS_ARRAY = np.array(_MONTH_OFFSETS, dtype=np.int64)
+_SEASON_CALENDAR_CODES = np.array([SEASON_CODES[season] for season in SEASON_CALENDAR], dtype=np.int64)
+_SUMMER_CALENDAR = np.array([half_year == Seasons.SUMMER for half_year in HALF_YEAR_CALENDAR])
+# per season code: start month, start day, start day index, end day index, crosses the year boundary
+_START_MONTHS = np.array([SEASONS[season]['start'][0] for season in SEASON_CODES], dtype=np.int64)
+_START_DAYS = np.array([SEASONS[season]['start'][1] for season in SEASON_CODES], dtype=np.int64)
+_START_INDEXES = np.array([SEASON_BOUNDS[season][0] for season in SEASON_CODES], dtype=np.int64)
+_END_INDEXES = np.array([SEASON_BOUNDS[season][1] for season in SEASON_CODES], dtype=np.int64)
+_CROSSES_YEAR = np.array([SEASON_BOUNDS[season][2] for season in SEASON_CODES], dtype=np.int64)
+
+NAT = np.datetime64('NaT', 'D')
+_NAT_INT = np.iinfo(np.int64).min
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def to_date_array(dates):
+    """Converts an iterable of dates (None allowed) to a datetime64[D] array (None -> NaT)"""
+    # going through ordinals is much cheaper than letting numpy convert each date object
+    ordinals = [_NAT_INT if date is None else date.toordinal() - _EPOCH_ORDINAL for date in dates]
+    return np.array(ordinals, dtype=np.int64).view('datetime64[D]')
+
+
+def to_season_array(seasons):
+    """Converts an iterable of season names (None allowed) to an array of season codes (unknown -> INVALID_SEASON)"""
+    return np.array([SEASON_CODES.get(season, INVALID_SEASON) for season in seasons], dtype=np.int64)
+
+
+def to_frequency_array(frequencies):
+    """Converts an iterable of frequencies (None allowed) to an integer array (None -> -1)"""
+    return np.array([-1 if frequency is None else frequency for frequency in frequencies], dtype=np.int64)
+
+
+def to_dates(date_array):
+    """Converts a datetime64[D] array back to a list of datetime.date (NaT -> None)"""
+    return date_array.astype(object).tolist()
+
+
+class BatchSeasonManager:
+    """
+    Vectorized counterpart of SeasonManager: every method takes arrays of dates (datetime64[D])
+    and season codes and computes the result for all of them at once.
+    """
+
+    @staticmethod
+    def split_dates(dates):
+        """Returns the years, months and days of a datetime64[D] array"""
+        months = dates.astype('datetime64[M]')
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        month_numbers = months.astype(np.int64) % 12 + 1
+        days = (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+        return years, month_numbers, days
+
+    @staticmethod
+    def day_indexes(dates):
+        """Vectorized season_manager.day_index (NaT dates are mapped to index 0 and must be masked by the caller)"""
+        _, months, days = BatchSeasonManager.split_dates(np.where(np.isnat(dates), np.datetime64('2000-01-01'), dates))
+        return _MONTH_OFFSETS_ARRAY[months] + days - 1
+
+    @staticmethod
+    def check_seasons(seasons, mask=None):
+        """Raises a ValueError if one of the (masked) seasons is invalid"""
+        invalid = seasons == INVALID_SEASON
+        if mask is not None:
+            invalid &= mask
+        if invalid.any():
+            raise ValueError("Invalid season")
+
+    @staticmethod
+    def season_start_dates(seasons, years):
+        """Vectorized season_manager.season_start_date"""
+        months = (years - 1970) * 12 + _START_MONTHS[seasons] - 1
+        return months.astype('datetime64[M]').astype('datetime64[D]') + (_START_DAYS[seasons] - 1)
+
+    def get_seasons(self, dates):
+        """Returns the season code of each date"""
+        return _SEASON_CALENDAR_CODES[self.day_indexes(dates)]
+
+    def is_summer_half_year(self, dates):
+        """Returns whether each date is in the SUMMER half year"""
+        return _SUMMER_CALENDAR[self.day_indexes(dates)]
+
+    def get_start_date_of_current_or_next_seasons(self, dates, seasons):
+        """Vectorized SeasonManager.get_start_date_of_current_or_next_seasons"""
+        self.check_seasons(seasons)
+        years, _, _ = self.split_dates(dates)
+        start_years = years - _CROSSES_YEAR[seasons] + (self.day_indexes(dates) > _END_INDEXES[seasons])
+        return np.where(np.isnat(dates), NAT, self.season_start_dates(seasons, start_years))
+
+    def get_start_date_of_target_season(self, dates, seasons):
+        """Vectorized SeasonManager.get_start_date_of_target_season"""
+        self.check_seasons(seasons)
+        years, _, _ = self.split_dates(dates)
+        start_years = years + (self.day_indexes(dates) >= _START_INDEXES[seasons])
+        return np.where(np.isnat(dates), NAT, self.season_start_dates(seasons, start_years))
+
+    def get_next_season_dates(self, today, enabled, seasons, last_dates):
+        """
+        Vectorized CareManager.get_next_season_date, for the rows where the action is enabled (NaT otherwise).
+        Rows that were never done get the start of the current or next season, the others the next occurrence.
+        """
+        self.check_seasons(seasons, mask=enabled)
+        # disabled rows may not have a season: compute them as any season and mask them afterward
+        safe_seasons = np.where(enabled, seasons, 0)
+        todays = np.full(len(seasons), today, dtype='datetime64[D]')
+        never_done = np.isnat(last_dates)
+        next_dates = np.where(
+            never_done,
+            self.get_start_date_of_current_or_next_seasons(todays, safe_seasons),
+            self.get_start_date_of_target_season(np.where(never_done, todays, last_dates), safe_seasons),
+        )
+        return np.where(enabled, next_dates, NAT)
+
+    def get_care_states(self, today: datetime.date, last_watered, water_frequency_summer, water_frequency_winter,
+                        fertilizer, fertilizer_season, last_fertilized,
+                        repotting, repotting_season, last_repotted):
+        """
+        Computes the care fields of many plants at once.
+        Dates are datetime64[D] arrays (NaT for None), seasons are arrays of season codes,
+        frequencies integer arrays (negative when missing) and fertilizer / repotting boolean arrays.
+        Returns a dict of arrays keyed like CareManager.care_fields.
+        """
+        today = np.datetime64(today, 'D')
+        never_watered = np.isnat(last_watered)
+        water_frequency = np.where(
+            self.is_summer_half_year(np.where(never_watered, today, last_watered)),
+            water_frequency_summer, water_frequency_winter
+        )
+        next_water_date = np.where(
+            never_watered, today,
+            np.where(water_frequency < 0, NAT, last_watered + water_frequency.astype('timedelta64[D]'))
+        )
+        next_fertilize_date = self.get_next_season_dates(today, fertilizer, fertilizer_season, last_fertilized)
+        next_repotting_date = self.get_next_season_dates(today, repotting, repotting_season, last_repotted)
+        # NaT comparisons are always False
+        return dict(
+            next_water_date=next_water_date,
+            should_water=next_water_date <= today,
+            next_fertilize_date=next_fertilize_date,
+            should_fertilize=next_fertilize_date <= today,
+            next_repotting_date=next_repotting_date,
+            should_repot=next_repotting_date <= today,
+        )
@@ -0,0 +1,183 @@
+import datetime
+import logging
+
+import numpy as np
+from django.utils import timezone
+
+from .batch_season_manager import (
+    BatchSeasonManager, to_date_array, to_season_array, to_frequency_array, to_dates
+)
+from .constants import Seasons
+from .season_manager import SeasonManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class CareManager:
+    """
+    Computes the care state of a plant (next care dates and should_* flags) in memory.
+    Nothing is persisted here: callers decide how (and how many times) to write the result.
+    """
+    care_fields = [
+        'next_water_date', 'should_water',
+        'next_fertilize_date', 'should_fertilize',
+        'next_repotting_date', 'should_repot',
+    ]
+    # fields the care state is computed from
+    care_input_fields = [
+        'last_watered', 'water_frequency_summer', 'water_frequency_winter',
+        'fertilizer', 'fertilizer_season', 'last_fertilized',
+        'repotting', 'repotting_season', 'last_repotted',
+    ]
+
+    def __init__(self, today: datetime.date = None):
+        self.today = today or datetime.date.today()
+        self.season_manager = SeasonManager()
+
+    def get_water_frequency(self, plant):
+        """Returns the watering frequency matching the half year the plant was last watered in"""
+        half_year_season = self.season_manager.get_half_year(date=plant.last_watered or self.today)
+        if half_year_season == Seasons.SUMMER:
+            return plant.water_frequency_summer
+        return plant.water_frequency_winter
+
+    def get_next_water_date(self, plant):
+        if plant.last_watered is None:
+            return self.today
+        return plant.last_watered + datetime.timedelta(days=self.get_water_frequency(plant))
+
+    def get_next_fertilize_date(self, plant):
+        if not plant.fertilizer:
+            return None
+        return self.get_next_season_date(season=plant.fertilizer_season, last_date=plant.last_fertilized)
+
+    def get_next_repotting_date(self, plant):
+        if not plant.repotting:
+            return None
+        return self.get_next_season_date(season=plant.repotting_season, last_date=plant.last_repotted)
+
+    def get_next_season_date(self, season, last_date=None):
+        """Returns the start date of the current or next season, relative to the last time the action was done"""
+        if last_date is None:
+            return self.season_manager.get_start_date_of_current_or_next_seasons(self.today, season)
+        return self.season_manager.get_start_date_of_target_season(last_date, season)
+
+    def is_due(self, next_date):
+        return next_date is not None and self.today >= next_date
+
+    def get_care_state(self, plant):
+        """Returns all the care fields of a plant as a dict"""
+        next_water_date = self.get_next_water_date(plant)
+        next_fertilize_date = self.get_next_fertilize_date(plant)
+        next_repotting_date = self.get_next_repotting_date(plant)
+        return dict(
+            next_water_date=next_water_date,
+            should_water=self.is_due(next_water_date),
+            next_fertilize_date=next_fertilize_date,
+            should_fertilize=self.is_due(next_fertilize_date),
+            next_repotting_date=next_repotting_date,
+            should_repot=self.is_due(next_repotting_date),
+        )
+
+    def refresh(self, plant):
+        """Sets all the care fields on the plant (in memory) and returns the computed state"""
+        care_state = self.get_care_state(plant)
+        for field, value in care_state.items():
+            setattr(plant, field, value)
+        return care_state
+
+    def get_care_arrays(self, columns):
+        """
+        Vectorized get_care_state: takes the care input fields as columns (dict of field -> list of values)
+        and returns the care fields as a dict of arrays, computed by the BatchSeasonManager.
+        """
+        return BatchSeasonManager().get_care_states(
+            today=self.today,
+            last_watered=to_date_array(columns['last_watered']),
+            water_frequency_summer=to_frequency_array(columns['water_frequency_summer']),
+            water_frequency_winter=to_frequency_array(columns['water_frequency_winter']),
+            fertilizer=np.array(columns['fertilizer'], dtype=bool),
+            fertilizer_season=to_season_array(columns['fertilizer_season']),
+            last_fertilized=to_date_array(columns['last_fertilized']),
+            repotting=np.array(columns['repotting'], dtype=bool),
+            repotting_season=to_season_array(columns['repotting_season']),
+            last_repotted=to_date_array(columns['last_repotted']),
+        )
+
+    def get_care_states(self, plants):
+        """Returns the care fields of many plants as a list of dicts (same as get_care_state), computed at once"""
+        columns = {field: [getattr(plant, field) for plant in plants] for field in self.care_input_fields}
+        care_arrays = self.get_care_arrays(columns)
+        care_columns = [
+            to_dates(values) if values.dtype.kind == 'M' else values.tolist()
+            for values in (care_arrays[field] for field in self.care_fields)
+        ]
+        return [dict(zip(self.care_fields, row)) for row in zip(*care_columns)]
+
+    def bulk_refresh(self, queryset, batch_size=500):
+        """
+        Refreshes the care fields of every plant of the queryset in memory (vectorized),
+        then writes back only the rows whose care state changed with bulk_update (one UPDATE ... CASE per batch).
+        Returns the refreshed plants.
+        """
+        plants = list(queryset)
+        changed_plants = list()
+        now = timezone.now()
+        for plant, care_state in zip(plants, self.get_care_states(plants)):
+            if care_state != {field: getattr(plant, field) for field in self.care_fields}:
+                for field, value in care_state.items():
+                    setattr(plant, field, value)
+                plant.updated = now
+                changed_plants.append(plant)
+        if changed_plants:
+            queryset.model.objects.bulk_update(changed_plants, [*self.care_fields, 'updated'], batch_size=batch_size)
+        logger.info(f'Care refreshed for {len(plants)} plants ({len(changed_plants)} updated)')
+        return plants
+
+    def refresh_all(self, queryset, chunk_size=2000):
+        """
+        Recomputes the care fields of every plant of the queryset without instantiating the plants:
+        rows are read by chunks of raw columns (keyset pagination on id), computed with array operations,
+        and only the rows whose care state changed are written back.
+        Returns the number of plants updated.
+        """
+        model = queryset.model
+        fields = ['id', *self.care_input_fields, *self.care_fields]
+        last_id = 0
+        updated_count = 0
+        now = timezone.now()
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list(*fields)[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            columns = dict(zip(fields, zip(*rows)))
+            care_arrays = self.get_care_arrays(columns)
+            changed = np.zeros(len(rows), dtype=bool)
+            for field in self.care_fields:
+                values = care_arrays[field]
+                if values.dtype.kind == 'M':
+                    previous_values = to_date_array(columns[field])
+                    changed |= ~((values == previous_values) | (np.isnat(values) & np.isnat(previous_values)))
+                else:
+                    changed |= values != np.array(columns[field], dtype=bool)
+            changed_indexes = np.flatnonzero(changed)
+            if not len(changed_indexes):
+                continue
+            care_columns = {
+                field: to_dates(values[changed_indexes]) if values.dtype.kind == 'M'
+                else values[changed_indexes].tolist()
+                for field, values in care_arrays.items()
+            }
+            plants = [
+                model(
+                    id=columns['id'][index], updated=now,
+                    **{field: care_columns[field][i] for field in self.care_fields}
+                )
+                for i, index in enumerate(changed_indexes)
+            ]
+            model.objects.bulk_update(plants, [*self.care_fields, 'updated'])
+            updated_count += len(plants)
+        logger.info(f'Care refreshed for all plants ({updated_count} updated)')
+        return updated_count
@@ -0,0 +1,87 @@
+import json
+import logging
+import time
+from functools import lru_cache
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventTypes:
+    NOTIFICATION = 'notification'
+    AI_PLANT_ANSWER = 'ai_plant_answer'
+
+
+def get_user_channel(user_id):
+    return f'wizplant:events:user:{user_id}'
+
+
+@lru_cache
+def get_redis():
+    """Returns the redis client used for the events pub/sub (a connection pool shared by the process)"""
+    return redis.Redis.from_url(
+        settings.EVENTS_REDIS_URL,
+        socket_connect_timeout=settings.EVENTS_REDIS_CONNECT_TIMEOUT,
+        socket_timeout=settings.EVENTS_REDIS_SOCKET_TIMEOUT,
+    )
+
+
+def publish_events(events):
+    """
+    Publishes events, given as (user id, event type, data) tuples, to the users' channels in one round trip.
+    Events are best effort: clients also get the data through the API, so a redis failure is only logged.
+    """
+    if not events:
+        return
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for user_id, event_type, data in events:
+            pipeline.publish(get_user_channel(user_id), json.dumps(dict(type=event_type, data=data), default=str))
+        pipeline.execute()
+    except redis.RedisError as ex:
+        logger.warning(f'Could not publish {len(events)} events: {ex}')
+
+
+def publish_events_on_commit(events):
+    """Publishes the events once the current transaction is committed, so that clients can read the data"""
+    transaction.on_commit(lambda: publish_events(events))
+
+
+async def subscribe(user_id, timeout=None, heartbeat_interval=None):
+    """
+    Yields the events published to a user, as dicts ({type, data}), for `timeout` seconds.
+    None is yielded every `heartbeat_interval` seconds without events, so that the caller can keep the connection alive.
+    Async (redis.asyncio): waiting for events does not hold a server thread, see EventStreamView.
+    """
+    timeout = timeout or settings.EVENTS_STREAM_TIMEOUT
+    heartbeat_interval = heartbeat_interval or settings.EVENTS_HEARTBEAT_INTERVAL
+    # one connection per stream: a pub/sub connection is dedicated to its subscriber anyway
+    # the socket timeout covers the heartbeat wait of get_message, on top of the usual socket timeout
+    client = redis.asyncio.Redis.from_url(
+        settings.EVENTS_REDIS_URL,
+        socket_connect_timeout=settings.EVENTS_REDIS_CONNECT_TIMEOUT,
+        socket_timeout=heartbeat_interval + settings.EVENTS_REDIS_SOCKET_TIMEOUT,
+    )
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(get_user_channel(user_id))
+        end = time.monotonic() + timeout
+        while time.monotonic() < end:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=min(heartbeat_interval, max(end - time.monotonic(), 0))
+            )
+            if message is None:
+                yield None
+                continue
+            try:
+                yield json.loads(message['data'])
+            except ValueError:
+                logger.warning(f'Invalid event for user {user_id}: {message["data"]}')
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,86 @@
+import io
+import logging
+import os
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+logger = logging.getLogger(__name__)
+
+
+# extension -> Pillow format. WebP first, JPEG as a fallback for clients that don't support it
+DERIVATIVE_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+
+
+def get_derivative_name(name, size, extension):
+    """Returns the storage name of a derivative, next to the original image"""
+    root, _ = os.path.splitext(name)
+    return f'{root}_{size}.{extension}'
+
+
+def encode_image(img, img_format, quality):
+    buffer = io.BytesIO()
+    if img_format == 'JPEG' and img.mode != 'RGB':
+        # JPEG has no alpha channel: flatten the image on a white background
+        rgba_img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, 'white')
+        background.paste(rgba_img, mask=rgba_img.getchannel('A'))
+        img = background
+    img.save(buffer, format=img_format, quality=quality)
+    return buffer.getvalue()
+
+
+def generate_image_derivatives(field_file, sizes=None):
+    """
+    Generates downsized copies of an image (one per size and format) in the image storage.
+    Returns the derivatives names as a dict: {'<size>': {'<extension>': '<name>'}}, to be stored in a JSONField.
+    """
+    sizes = sizes or settings.IMAGE_DERIVATIVE_SIZES
+    quality = settings.IMAGE_DERIVATIVE_QUALITY
+    storage = field_file.storage
+    with field_file.open('rb'), Image.open(field_file) as img:
+        img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        # palette / grayscale images are resampled poorly
+        img = img.convert('RGBA')
+    derivatives = dict()
+    # from the largest to the smallest size, so that each derivative is downscaled from the previous one
+    for size in sorted(sizes, reverse=True):
+        img.thumbnail((size, size))
+        derivatives[str(size)] = {
+            extension: storage.save(
+                get_derivative_name(field_file.name, size, extension),
+                ContentFile(encode_image(img, img_format, quality))
+            )
+            for extension, img_format in DERIVATIVE_FORMATS.items()
+        }
+    logger.info(f'{len(sizes) * len(DERIVATIVE_FORMATS)} derivatives generated for {field_file.name}')
+    return derivatives
+
+
+def delete_image_derivatives(storage, derivatives):
+    """Deletes the derivatives (as returned by generate_image_derivatives) from the image storage"""
+    if not derivatives:
+        return
+    for names in derivatives.values():
+        for name in names.values():
+            storage.delete(name)
+    logger.info(f'{sum(len(names) for names in derivatives.values())} derivatives deleted')
+
+
+def get_image_derivative_urls(field_file, derivatives, request=None):
+    """Returns the derivatives URLs as a dict: {'<size>': {'<extension>': '<url>'}} (absolute if a request is given)"""
+    if not field_file or not derivatives:
+        return None
+    urls = dict()
+    for size, names in derivatives.items():
+        urls[size] = dict()
+        for extension, name in names.items():
+            url = field_file.storage.url(name)
+            urls[size][extension] = request.build_absolute_uri(url) if request else url
+    return urls
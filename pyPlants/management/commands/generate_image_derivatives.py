@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from ai.models import AIPlantAnswer
+from ai.tasks import generate_ai_plant_answer_image_derivatives_task
+from pyPlants.models import Plant
+from pyPlants.tasks import process_plant_image
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Schedules the image processing of the plants and AI plant answers whose image has no derivatives yet'
+
+    def handle(self, *args, **options):
+        plant_ids = Plant.objects.exclude(image='').exclude(image__isnull=True).filter(
+            image_derivatives__isnull=True
+        ).values_list('id', flat=True)
+        plant_count = 0
+        for plant_id in plant_ids.iterator():
+            process_plant_image.delay(plant_id)
+            plant_count += 1
+        logger.info(f'{plant_count} plant images scheduled for processing')
+
+        ai_plant_answer_ids = AIPlantAnswer.objects.exclude(image='').exclude(image__isnull=True).filter(
+            image_derivatives__isnull=True
+        ).values_list('id', flat=True)
+        ai_plant_answer_count = 0
+        for ai_plant_answer_id in ai_plant_answer_ids.iterator():
+            generate_ai_plant_answer_image_derivatives_task.delay(ai_plant_answer_id)
+            ai_plant_answer_count += 1
+        logger.info(f'{ai_plant_answer_count} AI plant answer images scheduled for processing')
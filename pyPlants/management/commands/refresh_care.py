@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from pyPlants.care_manager import CareManager
+from pyPlants.models import Plant
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the care state (next dates and should_* flags) of every complete plant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        updated_count = CareManager().refresh_all(
+            Plant.objects.filter(is_complete=True), chunk_size=options['chunk_size']
+        )
+        logger.info(f'{updated_count} plants updated')
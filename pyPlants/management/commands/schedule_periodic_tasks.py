@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pyPlants.task_scheduler import schedule_periodic_tasks
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Creates the global periodic tasks (hourly care sweeps, notification retention)'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        tasks = schedule_periodic_tasks()
+        for task in tasks:
+            logger.info(f'Scheduled {task.name}')
+        logger.info('Done!')
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0017_rename_language_plantuser_default_language'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['user', 'next_water_date'], name='plant_user_next_water_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['user', 'next_fertilize_date'], name='plant_user_next_fertilize_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['user', 'next_repotting_date'], name='plant_user_next_repotting_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+def set_existing_images_ready(apps, schema_editor):
+    # existing images were processed when they were saved
+    Plant = apps.get_model('pyPlants', 'Plant')
+    Plant.objects.exclude(image='').exclude(image__isnull=True).update(image_status='READY')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0018_plant_due_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('READY', 'Ready'), ('FAILED', 'Failed')], help_text='Status of the (asynchronous) image processing', max_length=20, null=True),
+        ),
+        migrations.RunPython(set_existing_images_ready, migrations.RunPython.noop),
+    ]
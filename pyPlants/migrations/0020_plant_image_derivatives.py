@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0019_plant_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, help_text='Downsized copies of the image, by size and format', null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0020_plant_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='delivery_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='delivery_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='delivery_status',
+            field=models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('RETRYING', 'Retrying'), ('SENT', 'Sent'), ('FAILED', 'Failed')], max_length=20, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0021_notification_delivery_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='digest_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('user', 'notification_type', 'digest_date'), name='notification_user_type_digest_unique'),
+        ),
+    ]
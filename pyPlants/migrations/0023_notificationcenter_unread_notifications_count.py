@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 13:34
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
+
+
+def count_unread_notifications(apps, schema_editor):
+    NotificationCenter = apps.get_model('pyPlants', 'NotificationCenter')
+    Notification = apps.get_model('pyPlants', 'Notification')
+    unread_count = Notification.objects.filter(
+        user_id=OuterRef('user_id'), viewed=False
+    ).order_by().values('user_id').annotate(count=Count('id')).values('count')
+    NotificationCenter.objects.update(unread_notifications_count=Coalesce(Subquery(unread_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0022_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcenter',
+            name='unread_notifications_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
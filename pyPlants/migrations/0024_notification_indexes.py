@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0023_notificationcenter_unread_notifications_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-sent_at'], name='notification_user_sent_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'viewed'], name='notification_user_viewed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created'], name='notification_created_idx'),
+        ),
+    ]
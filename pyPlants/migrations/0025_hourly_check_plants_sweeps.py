@@ -0,0 +1,36 @@
+# Generated by Django 5.0 on 2026-10-18 13:39
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def replace_user_tasks_with_sweeps(apps, schema_editor):
+    # users are now checked by the hourly sweeps: drop their own periodic tasks and create the 24 sweeps
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+    CrontabSchedule = apps.get_model('django_celery_beat', 'CrontabSchedule')
+    PeriodicTask.objects.filter(task='pyPlants.tasks.check_plants').delete()
+    for hour in range(24):
+        schedule, _ = CrontabSchedule.objects.get_or_create(hour=hour, minute=0)
+        PeriodicTask.objects.get_or_create(
+            name=f'Check plants sweep at {hour}h',
+            defaults=dict(task='pyPlants.tasks.check_plants_sweep', crontab=schedule, args=f'[{hour}]'),
+        )
+    # historical models do not send the signals that tell beat to reload its schedule
+    PeriodicTasks.objects.update_or_create(ident=1, defaults=dict(last_update=timezone.now()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0024_notification_indexes'),
+        ('django_celery_beat', '0018_improve_crontab_helptext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificationcenter',
+            index=models.Index(fields=['preferred_notification_hour', 'user'], name='notif_center_hour_user_idx'),
+        ),
+        migrations.RunPython(replace_user_tasks_with_sweeps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pyPlants', '0025_hourly_check_plants_sweeps'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='delivery_status',
+            field=models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('RETRYING', 'Retrying'), ('SENT', 'Sent'), ('FAILED', 'Failed')], max_length=20, null=True),
+        ),
+    ]
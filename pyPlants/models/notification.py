@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 from pyPlants.constants import Notifications
@@ -11,7 +13,61 @@ class NotificationType(models.TextChoices):
     IN_APP = Notifications.IN_APP, Notifications.IN_APP
 
 
+class NotificationQuerySet(models.QuerySet):
+    def mark_as_sent(self, sent_at=None):
+        """
+        Set-based Notification.mark_as_sent: stamps the notifications and the last_notification_sent
+        of their users' notification centers with one UPDATE each. Returns the number of notifications updated.
+        """
+        from pyPlants.models import NotificationCenter
+        sent_at = sent_at or timezone.now()
+        # before stamping the notifications, in case the queryset filters on them
+        NotificationCenter.objects.filter(user_id__in=self.values('user_id')).update(last_notification_sent=sent_at)
+        return self.update(sent=True, sent_at=sent_at)
+
+    def claim_for_delivery(self, delivery_statuses=None):
+        """
+        Claims the notifications of the queryset to deliver (PENDING by default): they are switched to SENDING,
+        rows being claimed by a concurrent delivery are skipped. Returns the ids claimed: only those may be sent,
+        so that a notification queued twice is delivered once.
+        """
+        delivery_statuses = delivery_statuses or [Notification.DeliveryStatus.PENDING]
+        with transaction.atomic():
+            notification_ids = list(
+                self.select_for_update(skip_locked=True).filter(
+                    delivery_status__in=delivery_statuses
+                ).values_list('id', flat=True)
+            )
+            if notification_ids:
+                self.model.objects.filter(id__in=notification_ids).update(
+                    delivery_status=Notification.DeliveryStatus.SENDING
+                )
+        return notification_ids
+
+    def mark_as_viewed(self):
+        """
+        Set-based Notification.mark_as_viewed: marks the unread notifications of the queryset with one UPDATE,
+        then recomputes the unread counters of their users. Returns the number of notifications marked.
+        """
+        from pyPlants.models import NotificationCenter
+        now = timezone.now()
+        unread_notifications = self.filter(viewed=False)
+        # before marking the notifications, in case the queryset filters on them
+        user_ids = list(unread_notifications.values_list('user_id', flat=True).distinct())
+        marked_count = unread_notifications.update(viewed=True, viewed_at=now, updated=now)
+        if marked_count:
+            NotificationCenter.objects.filter(user_id__in=user_ids).refresh_unread_notifications_count()
+        return marked_count
+
+
 class Notification(AbstractPlantModel):
+    class DeliveryStatus(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        RETRYING = 'RETRYING', 'Retrying'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
     user = models.ForeignKey(PlantUser, on_delete=models.CASCADE)
     message = models.TextField()
     notification_type = models.CharField(
@@ -23,14 +79,67 @@ class Notification(AbstractPlantModel):
     sent_at = models.DateTimeField(null=True, blank=True)
     viewed = models.BooleanField(default=False)
     viewed_at = models.DateTimeField(null=True, blank=True)
+    # email / sms notifications are delivered asynchronously (in-app notifications have no delivery status)
+    delivery_status = models.CharField(max_length=20, choices=DeliveryStatus.choices, null=True, blank=True)
+    delivery_attempts = models.PositiveIntegerField(default=0)
+    delivery_error = models.TextField(null=True, blank=True)
+    # care notifications are coalesced into one digest per user, type and day
+    digest_date = models.DateField(null=True, blank=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    digest_fields = ('user', 'notification_type', 'digest_date')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'notification_type', 'digest_date'], name='notification_user_type_digest_unique'
+            ),
+        ]
+        indexes = [
+            # notifications list (ordered by -sent_at) and unread notifications of a user
+            models.Index(fields=['user', '-sent_at'], name='notification_user_sent_at_idx'),
+            models.Index(fields=['user', 'viewed'], name='notification_user_viewed_idx'),
+            # retention
+            models.Index(fields=['created'], name='notification_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.email} - {self.notification_type} - {self.message}'
 
+    def save(self, *args, **kwargs):
+        from pyPlants.models import NotificationCenter
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding and not self.viewed:
+            NotificationCenter.objects.filter(user_id=self.user_id).update(
+                unread_notifications_count=F('unread_notifications_count') + 1
+            )
+
+    def get_event_data(self):
+        return dict(
+            id=self.id,
+            notification_type=self.notification_type,
+            message=self.message,
+            sent_at=self.sent_at,
+            digest_date=self.digest_date,
+        )
+
+    def get_digest_key(self):
+        return self.user_id, self.notification_type, self.digest_date
+
     def mark_as_viewed(self):
+        from pyPlants.models import NotificationCenter
+        now = timezone.now()
+        # only the request that actually marks the notification as viewed decrements the counter
+        marked = Notification.objects.filter(id=self.id, viewed=False).update(viewed=True, viewed_at=now, updated=now)
+        if marked:
+            NotificationCenter.objects.filter(user_id=self.user_id).update(
+                unread_notifications_count=Greatest(F('unread_notifications_count') - 1, 0)
+            )
         self.viewed = True
-        self.viewed_at = timezone.now()
-        self.save()
+        self.viewed_at = now
+        self.updated = now
 
     def mark_as_sent(self):
         from pyPlants.models import NotificationCenter
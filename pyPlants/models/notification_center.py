@@ -1,7 +1,18 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery, Count
+from django.db.models.functions import Coalesce
 
 from pyPlants.models import AbstractPlantModel, PlantUser
-from pyPlants.task_scheduler import schedule_check_plant_task
+
+
+class NotificationCenterQuerySet(models.QuerySet):
+    def refresh_unread_notifications_count(self):
+        """Recomputes the unread notifications counters from the notifications, with a single UPDATE"""
+        from pyPlants.models import Notification
+        unread_count = Notification.objects.filter(
+            user_id=OuterRef('user_id'), viewed=False
+        ).order_by().values('user_id').annotate(count=Count('id')).values('count')
+        return self.update(unread_notifications_count=Coalesce(Subquery(unread_count), 0))
 
 
 class NotificationCenter(AbstractPlantModel):
@@ -11,7 +22,24 @@ class NotificationCenter(AbstractPlantModel):
     enable_sms_notifications = models.BooleanField(default=False)
     preferred_notification_hour = models.IntegerField(default=9)
     last_notification_sent = models.DateTimeField(null=True, blank=True)
+    # denormalized number of notifications not viewed yet, kept up to date by the Notification model
+    unread_notifications_count = models.PositiveIntegerField(default=0)
+
+    objects = NotificationCenterQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # users of an hourly sweep, paged by user id
+            models.Index(fields=['preferred_notification_hour', 'user'], name='notif_center_hour_user_idx'),
+        ]
+
+    # maintained with set-based updates, a save must not overwrite them with stale values
+    set_based_fields = ('last_notification_sent', 'unread_notifications_count')
 
     def save(self, *args, **kwargs):
-        schedule_check_plant_task(self)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.set_based_fields
+            ]
         super().save(*args, **kwargs)
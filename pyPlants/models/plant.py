@@ -1,12 +1,14 @@
-from datetime import date, timedelta
+from datetime import date
 
-from PIL import Image, ExifTags
-from django.db import models
+from PIL import Image, ImageOps, ExifTags
+from django.db import models, transaction
 from django.db.models import When, Q, Value, Case, F
+from django.utils import timezone
 
+from pyPlants.care_manager import CareManager
 from pyPlants.constants import Seasons
+from pyPlants.image_derivatives import generate_image_derivatives, delete_image_derivatives
 from pyPlants.models import AbstractPlantModel, PlantUser
-from pyPlants.season_manager import SeasonManager
 from pyPlants.utils import plant_pics_directory_path
 
 
@@ -17,6 +19,56 @@ class SeasonType(models.TextChoices):
     WINTER = Seasons.WINTER, Seasons.WINTER
 
 
+class PlantQuerySet(models.QuerySet):
+    def due(self, today=None):
+        """
+        Complete plants with at least one care action due on `today` (or never computed yet).
+        Plants whose next care dates are all in the future are skipped: their care state can't change before then.
+        """
+        today = today or date.today()
+        return self.filter(
+            Q(next_water_date__isnull=True) | Q(next_water_date__lte=today)
+            | Q(fertilizer=True) & (Q(next_fertilize_date__isnull=True) | Q(next_fertilize_date__lte=today))
+            | Q(repotting=True) & (Q(next_repotting_date__isnull=True) | Q(next_repotting_date__lte=today)),
+            is_complete=True,
+        )
+
+    @transaction.atomic
+    def bulk_care(self, actions):
+        """
+        Applies care actions, given as (plant id, action) pairs with action in Plant.care_actions,
+        on the plants of the queryset: one SELECT ... FOR UPDATE and one bulk UPDATE, in a single transaction.
+        Raises Plant.DoesNotExist if a plant is not part of the queryset
+        and ValueError if an action is not possible (nothing is saved then).
+        Returns the updated plants.
+        """
+        # keeps the order of the request
+        plant_ids = list(dict.fromkeys(plant_id for plant_id, _ in actions))
+        plants_by_id = self.select_for_update().in_bulk(plant_ids)
+        missing_ids = set(plant_ids) - plants_by_id.keys()
+        if missing_ids:
+            raise self.model.DoesNotExist(f'Plants not found: {sorted(missing_ids)}')
+        plants = [plants_by_id[plant_id] for plant_id in plant_ids]
+        for plant_id, action in actions:
+            plant = plants_by_id[plant_id]
+            try:
+                getattr(plant, action)(commit=False)
+            except ValueError as err:
+                raise ValueError(f'{plant.name} ({plant.id}): {err}')
+        care_manager = CareManager()
+        complete_plants = [plant for plant in plants if plant.is_complete]
+        for plant, care_state in zip(complete_plants, care_manager.get_care_states(complete_plants)):
+            for field, value in care_state.items():
+                setattr(plant, field, value)
+        now = timezone.now()
+        for plant in plants:
+            plant.updated = now
+        self.model.objects.bulk_update(
+            plants, ['last_watered', 'last_fertilized', 'last_repotted', *CareManager.care_fields, 'updated']
+        )
+        return plants
+
+
 class Plant(AbstractPlantModel):
     class EarthMoistureOptions(models.TextChoices):
         LIGHTLY_DRY = 'LIGHTLY_DRY', 'Lightly Dry'
@@ -32,9 +84,27 @@ class Plant(AbstractPlantModel):
         DIRECT_SUN = 'DIRECT_SUN', 'Direct Sun'
         NO_DIRECT_SUN = 'NO_DIRECT_SUN', 'No Direct Sun'
 
+    class ImageStatusOptions(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        PROCESSING = 'PROCESSING', 'Processing'
+        READY = 'READY', 'Ready'
+        FAILED = 'FAILED', 'Failed'
+
     name = models.CharField(max_length=150, blank=True, null=True)
     description = models.TextField(null=True, blank=True)
     image = models.ImageField(upload_to=plant_pics_directory_path, null=True, blank=True)
+    image_status = models.CharField(
+        max_length=20,
+        choices=ImageStatusOptions.choices,
+        null=True,
+        blank=True,
+        help_text='Status of the (asynchronous) image processing'
+    )
+    image_derivatives = models.JSONField(
+        null=True,
+        blank=True,
+        help_text='Downsized copies of the image, by size and format'
+    )
     user = models.ForeignKey(PlantUser, on_delete=models.CASCADE)
 
     # Sunlight
@@ -98,43 +168,170 @@ class Plant(AbstractPlantModel):
 
     is_complete = models.BooleanField(default=False)
 
+    objects = PlantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # due date lookups of the daily sweep
+            models.Index(fields=['user', 'next_water_date'], name='plant_user_next_water_idx'),
+            models.Index(fields=['user', 'next_fertilize_date'], name='plant_user_next_fertilize_idx'),
+            models.Index(fields=['user', 'next_repotting_date'], name='plant_user_next_repotting_idx'),
+        ]
+
+    # fields the care state depends on: the care fields are only recomputed when one of them changes
+    care_relevant_fields = {*CareManager.care_input_fields, 'is_complete'}
+    # fields derived from the others during save
+    derived_fields = {*CareManager.care_fields, 'is_complete', 'image_status', 'image_derivatives'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # values as persisted (None until the plant is saved or loaded): used to only save / process what changed
+        self._loaded_values = None
+        # set by link_processed_image: the new image and its derivatives are ready, it is not processed again
+        self._image_processed = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        values = self.get_field_values()
+        if fields is None or self._loaded_values is None:
+            self._loaded_values = values
+        else:
+            # e.g. a deferred field being loaded: the other fields may have pending changes
+            for field in fields:
+                attname = self._meta.get_field(field).attname
+                self._loaded_values[attname] = values[attname]
+
+    def get_field_values(self):
+        """Returns the current value of each (loaded) field, keyed by attname"""
+        deferred_fields = self.get_deferred_fields()
+        values = dict()
+        for field in self._meta.concrete_fields:
+            if field.generated or field.attname in deferred_fields:
+                continue
+            value = getattr(self, field.attname)
+            values[field.attname] = value.name if isinstance(field, models.FileField) else value
+        return values
+
+    def get_changed_fields(self):
+        """Returns the names of the fields changed since the plant was loaded or saved (None if it never was)"""
+        if self._loaded_values is None:
+            return None
+        changed_fields = set()
+        for attname, value in self.get_field_values().items():
+            # a field deferred at load time and set since then is considered changed
+            if attname not in self._loaded_values or value != self._loaded_values[attname]:
+                changed_fields.add(self._meta.get_field(attname).name)
+        return changed_fields
+
     def save(self, force_checks=True, *args, **kwargs):
+        changed_fields = self.get_changed_fields()
         self.is_complete = self.check_is_complete()
+        is_new = changed_fields is None or self._state.adding
+        if not is_new and self.is_complete != self._loaded_values.get('is_complete'):
+            changed_fields.add('is_complete')
+        if self.is_complete and force_checks and (is_new or changed_fields & self.care_relevant_fields):
+            # care fields are computed in memory so that they are persisted along with the rest of the row
+            self.check_needs_care(commit=False)
+        image_changed = bool(self.image) if is_new else 'image' in changed_fields
+        # the derivatives of the previous image are deleted once the new one is saved
+        previous_image = None if is_new else self._loaded_values.get('image')
+        previous_derivatives = None if is_new else self._loaded_values.get('image_derivatives')
+        if image_changed and self._image_processed:
+            self.image_status = self.ImageStatusOptions.READY
+        elif image_changed:
+            self.image_status = self.ImageStatusOptions.PENDING if self.image else None
+            self.image_derivatives = None
+
+        update_fields = kwargs.get('update_fields')
+        if not is_new:
+            changed_fields = self.get_changed_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *(changed_fields & self.derived_fields)}
+            elif not kwargs.get('force_insert'):
+                if not changed_fields:
+                    # nothing to write
+                    return
+                kwargs['update_fields'] = {*changed_fields, 'updated'}
         super().save(*args, **kwargs)
+        self._loaded_values = self.get_field_values()
+        if image_changed and previous_derivatives:
+            self.delete_image_derivatives_on_commit(previous_image, previous_derivatives)
+        if image_changed and self.image and not self._image_processed:
+            self.schedule_image_processing()
+        self._image_processed = False
+
+    def link_processed_image(self, field_file, image_derivatives):
+        """
+        Uses an image already stored and processed (e.g. generated by the AI service) as the plant image.
+        The plant references the same file and derivatives: nothing is copied nor processed again.
+        Without derivatives, the image is processed as a new upload.
+        """
+        self.image = field_file.name
+        self.image_derivatives = image_derivatives
+        self._image_processed = bool(image_derivatives)
+
+    def delete_image_derivatives_on_commit(self, image_name, derivatives):
+        """
+        Deletes the derivatives of a previous image once the change is committed,
+        unless they are shared with the AI plant answer the image was generated by (see link_processed_image).
+        """
+        from ai.models import AIPlantAnswer
+        if AIPlantAnswer.objects.filter(image=image_name).exists():
+            return
+        storage = self.image.storage
+        transaction.on_commit(lambda: delete_image_derivatives(storage, derivatives))
 
-        if self.is_complete and force_checks:
-            self.check_needs_care()
-        self.resize_image()
+    def schedule_image_processing(self):
+        """Processes the image in a celery task, once the new image is committed"""
+        from pyPlants.tasks import process_plant_image
+        plant_id = self.id
+        transaction.on_commit(lambda: process_plant_image.delay(plant_id))
 
-    def check_needs_care(self):
-        self.get_should_water()
-        self.get_should_fertilize()
-        self.get_should_repot()
+    def save_care_fields(self, fields):
+        """Persists the given care fields with a single UPDATE, without going through the whole save process"""
+        if self.pk is None:
+            self.save(force_checks=False)
+        else:
+            super().save(update_fields=[*fields, 'updated'])
+            if self._loaded_values is not None:
+                self._loaded_values.update({field: getattr(self, field) for field in fields})
+
+    def check_needs_care(self, commit=True):
+        """Computes every care field in one pass and (optionally) persists them with a single write"""
+        care_state = CareManager().refresh(self)
+        if commit:
+            self.save_care_fields(care_state.keys())
+        return care_state
 
-    def resize_image(self):
+    def process_image(self):
+        """
+        Rotates the image based on its EXIF orientation, resizes it (in place) and generates its derivatives.
+        Slow (the image is decoded): should be called from a celery task, see schedule_image_processing.
+        """
         img_dim = 1024
-        if self.image:
-            img = Image.open(self.image.path)
+        if not self.image:
+            return
+        with Image.open(self.image.path) as img:
+            img_format = img.format
             # Rotate the image based on EXIF orientation - an issue occurs when uploading images from iOS devices
-            try:
-                for orientation in ExifTags.TAGS.keys():
-                    if ExifTags.TAGS[orientation] == 'Orientation':
-                        break
-                exif = dict(img._getexif().items())
-                if exif[orientation] == 3:
-                    img = img.rotate(180, expand=True)
-                elif exif[orientation] == 6:
-                    img = img.rotate(270, expand=True)
-                elif exif[orientation] == 8:
-                    img = img.rotate(90, expand=True)
-            except (AttributeError, KeyError, IndexError):
-                # cases: image don't have getexif
-                pass
-            # Resize the image
-            if img.height > img_dim or img.width > img_dim:
-                output_size = (img_dim, img_dim)
-                img.thumbnail(output_size)
-                img.save(self.image.path)
+            is_rotated = img.getexif().get(ExifTags.Base.Orientation, 1) != 1
+            is_resized = img.height > img_dim or img.width > img_dim
+            if is_rotated or is_resized:
+                processed_img = ImageOps.exif_transpose(img)
+                # Resize the image
+                processed_img.thumbnail((img_dim, img_dim))
+                processed_img.save(self.image.path, format=img_format)
+        previous_derivatives = self.image_derivatives
+        self.image_derivatives = generate_image_derivatives(self.image)
+        # reprocessed: the new derivatives replace the previous ones
+        if previous_derivatives:
+            self.delete_image_derivatives_on_commit(self.image.name, previous_derivatives)
 
     def check_is_complete(self):
         """Checks if all required fields are filled out."""
@@ -143,91 +340,68 @@ class Plant(AbstractPlantModel):
             is_complete = True
         return is_complete
 
-    def water(self):
+    care_actions = ('water', 'fertilize', 'repot')
+
+    def water(self, commit=True):
         self.last_watered = date.today()
-        self.save()
+        if commit:
+            self.save()
 
     def get_should_water(self):
-        should_water = date.today() >= self.get_next_water_date()
-        self.should_water = should_water
-        self.save(force_checks=False)
-        return should_water
+        care_manager = CareManager()
+        self.next_water_date = care_manager.get_next_water_date(self)
+        self.should_water = care_manager.is_due(self.next_water_date)
+        self.save_care_fields(['next_water_date', 'should_water'])
+        return self.should_water
 
     def get_next_water_date(self):
-        if self.last_watered is None:
-            next_water_date = date.today()
-        else:
-            water_frequency = self.get_water_frequency()
-            next_water_date = self.last_watered + timedelta(days=water_frequency)
-        self.next_water_date = next_water_date
-        self.save(force_checks=False)
-        return next_water_date
+        self.next_water_date = CareManager().get_next_water_date(self)
+        self.save_care_fields(['next_water_date'])
+        return self.next_water_date
 
     def get_water_frequency(self):
-        season_manager = SeasonManager()
-        half_year_season = season_manager.get_half_year(date=self.last_watered)
-        if half_year_season == Seasons.SUMMER:
-            water_frequency = self.water_frequency_summer
-        else:
-            water_frequency = self.water_frequency_winter
-        return water_frequency
+        return CareManager().get_water_frequency(self)
 
-    def fertilize(self):
+    def fertilize(self, commit=True):
         if self.fertilizer:
             self.last_fertilized = date.today()
-            self.save()
+            if commit:
+                self.save()
         else:
             raise ValueError("This plant does not require fertilizer.")
 
     def get_should_fertilize(self):
         """Should only be called once a day or when data needs to be refreshed"""
-        should_fertilize = False
-        if self.fertilizer:
-            next_fertilize_date = self.get_next_fertilize_date()
-            if next_fertilize_date:
-                should_fertilize = date.today() >= next_fertilize_date
-        self.should_fertilize = should_fertilize
-        self.save(force_checks=False)
-        return should_fertilize
+        care_manager = CareManager()
+        self.next_fertilize_date = care_manager.get_next_fertilize_date(self)
+        self.should_fertilize = care_manager.is_due(self.next_fertilize_date)
+        self.save_care_fields(['next_fertilize_date', 'should_fertilize'])
+        return self.should_fertilize
 
     def get_next_fertilize_date(self):
         """Should only be called once a day or when data needs to be refreshed"""
-        next_fertilize_date = None
-        if self.fertilizer:
-            season_manager = SeasonManager()
-            next_fertilize_date = season_manager.get_next_or_current_season_start_date(
-                season=self.fertilizer_season, date=self.last_fertilized
-            )
-        self.next_fertilize_date = next_fertilize_date
-        self.save(force_checks=False)
-        return next_fertilize_date
-
-    def repot(self):
+        self.next_fertilize_date = CareManager().get_next_fertilize_date(self)
+        self.save_care_fields(['next_fertilize_date'])
+        return self.next_fertilize_date
+
+    def repot(self, commit=True):
         if self.repotting:
             self.last_repotted = date.today()
-            self.save()
+            if commit:
+                self.save()
         else:
             raise ValueError("This plant does not require repotting.")
 
     def get_should_repot(self):
         """Should only be called once a day or when data needs to be refreshed"""
-        should_repot = False
-        if self.repotting:
-            next_repot_date = self.get_next_repotting_date()
-            if next_repot_date:
-                should_repot = date.today() >= next_repot_date
-        self.should_repot = should_repot
-        self.save(force_checks=False)
-        return should_repot
+        care_manager = CareManager()
+        self.next_repotting_date = care_manager.get_next_repotting_date(self)
+        self.should_repot = care_manager.is_due(self.next_repotting_date)
+        self.save_care_fields(['next_repotting_date', 'should_repot'])
+        return self.should_repot
 
     def get_next_repotting_date(self):
         """Should only be called once a day or when data needs to be refreshed"""
-        next_repotting_date = None
-        if self.repotting:
-            season_manager = SeasonManager()
-            next_repotting_date = season_manager.get_next_or_current_season_start_date(
-                season=self.repotting_season, date=self.last_repotted
-            )
-        self.next_repotting_date = next_repotting_date
-        self.save(force_checks=False)
-        return next_repotting_date
+        self.next_repotting_date = CareManager().get_next_repotting_date(self)
+        self.save_care_fields(['next_repotting_date'])
+        return self.next_repotting_date
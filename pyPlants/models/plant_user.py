@@ -75,4 +75,5 @@ class PlantUser(AbstractBaseUser, PermissionsMixin, AbstractPlantModel):
 
     def current_ai_usage(self):
         from ai.models import AIPlantAnswer
-        return AIPlantAnswer.objects.filter(plant__user=self).count()
+        # answers served from the cache did not call OpenAI
+        return AIPlantAnswer.objects.filter(plant__user=self, from_cache=False).count()
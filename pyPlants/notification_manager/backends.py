@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from pyPlants.constants import Notifications
+from pyPlants.notification_manager.messages import get_message_templates
+
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDeliveryError(Exception):
+    """
+    Raised by the backends when a notification could not be delivered.
+    The delivery is retried, unless `retry` is False (e.g. the user has no phone number).
+    """
+    def __init__(self, message, retry=True):
+        super().__init__(message)
+        self.retry = retry
+
+
+def get_recipient(notification):
+    """Returns the email address or the phone number the notification is delivered to"""
+    if notification.notification_type == Notifications.EMAIL:
+        recipient = notification.user.email
+    elif notification.notification_type == Notifications.SMS:
+        recipient = str(notification.user.phone_number or '')
+    else:
+        raise NotificationDeliveryError(f'{notification.notification_type} notifications are not delivered', retry=False)
+    if not recipient:
+        raise NotificationDeliveryError(
+            f'No recipient for the {notification.notification_type} notification {notification.id}', retry=False
+        )
+    return recipient
+
+
+class BaseNotificationBackend:
+    """Delivers the notifications of a type (email, sms) to their user"""
+
+    def send(self, notification):
+        raise NotImplementedError
+
+    def send_many(self, notifications):
+        """
+        Delivers a batch of notifications. Returns the errors of the notifications that could not be delivered,
+        as a dict: {notification id: exception}.
+        """
+        errors = dict()
+        for notification in notifications:
+            try:
+                self.send(notification)
+            except Exception as ex:
+                errors[notification.id] = ex
+        return errors
+
+
+class ConsoleBackend(BaseNotificationBackend):
+    """Logs the notifications instead of delivering them, for local use"""
+
+    def send(self, notification):
+        logger.info(f'{notification.notification_type} to {get_recipient(notification)}:\n{notification.message}')
+
+
+class FileBackend(BaseNotificationBackend):
+    """Appends the notifications (one JSON per line) to a file per notification type, in NOTIFICATION_FILE_PATH"""
+
+    def send(self, notification):
+        recipient = get_recipient(notification)
+        os.makedirs(settings.NOTIFICATION_FILE_PATH, exist_ok=True)
+        file_path = os.path.join(settings.NOTIFICATION_FILE_PATH, f'{notification.notification_type.lower()}.log')
+        line = json.dumps(dict(
+            id=notification.id,
+            recipient=recipient,
+            message=notification.message,
+            sent_at=timezone.now().isoformat(),
+        ))
+        try:
+            with open(file_path, 'a') as file:
+                file.write(f'{line}\n')
+        except OSError as ex:
+            raise NotificationDeliveryError(str(ex)) from ex
+
+
+class EmailBackend(BaseNotificationBackend):
+    """
+    Sends the notifications by email, through django's EMAIL_BACKEND (console, file, smtp...).
+    A batch is sent through a single connection, opened once.
+    """
+
+    def build_message(self, notification, connection=None):
+        return EmailMessage(
+            subject=get_message_templates('email', notification.user.default_language)['subject'].render(),
+            body=notification.message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[get_recipient(notification)],
+            connection=connection,
+        )
+
+    def send(self, notification):
+        error = self.send_many([notification]).get(notification.id)
+        if error is not None:
+            raise error
+
+    def send_many(self, notifications):
+        errors = dict()
+        sent_ids = set()
+        try:
+            with get_connection(fail_silently=False) as connection:
+                for notification in notifications:
+                    try:
+                        # one message at a time (on the open connection) to know which ones failed
+                        connection.send_messages([self.build_message(notification, connection=connection)])
+                        sent_ids.add(notification.id)
+                    except NotificationDeliveryError as ex:
+                        errors[notification.id] = ex
+                    except Exception as ex:
+                        errors[notification.id] = NotificationDeliveryError(str(ex))
+        except Exception as ex:
+            # the connection could not be opened: the notifications not sent yet are retried
+            logger.exception(f'Email connection error: {ex}')
+            for notification in notifications:
+                if notification.id not in sent_ids:
+                    errors.setdefault(notification.id, NotificationDeliveryError(str(ex)))
+        return errors
+
+
+@lru_cache
+def get_backend(notification_type):
+    """Returns the delivery backend of a notification type, as configured in NOTIFICATION_BACKENDS"""
+    return import_string(settings.NOTIFICATION_BACKENDS[notification_type])()
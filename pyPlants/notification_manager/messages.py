@@ -0,0 +1,89 @@
+from functools import lru_cache
+from string import Formatter
+
+from pyPlants.models import PlantUser
+
+
+DEFAULT_LANGUAGE = PlantUser.LanguageChoices.ENGLISH
+
+# per language and channel: a header, then one line per care action (plant_names / count of the plants)
+MESSAGES = {
+    PlantUser.LanguageChoices.ENGLISH: {
+        'in_app': {
+            'header': 'Hey! It seems some of your plants need your attention! See below:',
+            'water': '\nYou need to water: {plant_names}.',
+            'fertilize': '\nYou need to fertilize: {plant_names}.',
+            'repot': '\nYou need to repot: {plant_names}.',
+        },
+        'sms': {
+            'header': 'Hey! It seems some of your plants need your attention!',
+            'water': '\n{count} plant(s) need to be watered.',
+            'fertilize': '\n{count} plant(s) need to be fertilized.',
+            'repot': '\n{count} plant(s) need to be repotted.',
+        },
+        'email': {
+            'subject': 'Some of your plants need your attention!',
+            'header': 'Hey! \n A friendly email to let you know that some of your plants need your attention! '
+                      'See below:',
+            'water': '\nYou need to water {count} plant(s)!\n{plant_names}.',
+            'fertilize': '\nYou need to fertilize {count} plant(s)!\n{plant_names}.',
+            'repot': '\nYou need to repot {count} plant(s)!\n{plant_names}.',
+        },
+    },
+    PlantUser.LanguageChoices.FRENCH: {
+        'in_app': {
+            'header': 'Hey ! Certaines de vos plantes ont besoin de votre attention ! Voir ci-dessous :',
+            'water': '\nVous devez arroser : {plant_names}.',
+            'fertilize': '\nVous devez fertiliser : {plant_names}.',
+            'repot': '\nVous devez rempoter : {plant_names}.',
+        },
+        'sms': {
+            'header': 'Hey ! Certaines de vos plantes ont besoin de votre attention !',
+            'water': '\n{count} plante(s) à arroser.',
+            'fertilize': '\n{count} plante(s) à fertiliser.',
+            'repot': '\n{count} plante(s) à rempoter.',
+        },
+        'email': {
+            'subject': 'Certaines de vos plantes ont besoin de votre attention !',
+            'header': 'Hey ! \n Un petit email pour vous dire que certaines de vos plantes ont besoin de votre '
+                      'attention ! Voir ci-dessous :',
+            'water': '\nVous devez arroser {count} plante(s) !\n{plant_names}.',
+            'fertilize': '\nVous devez fertiliser {count} plante(s) !\n{plant_names}.',
+            'repot': '\nVous devez rempoter {count} plante(s) !\n{plant_names}.',
+        },
+    },
+}
+
+CARE_ACTIONS = ('water', 'fertilize', 'repot')
+
+
+class MessageTemplate:
+    """
+    A message template parsed once: rendering only joins its literal parts and field values.
+    Fields are plain `{name}` placeholders.
+    """
+    def __init__(self, template):
+        self.parts = [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+
+    def render(self, **context):
+        return ''.join(literal + ('' if field is None else str(context[field])) for literal, field in self.parts)
+
+
+@lru_cache(maxsize=None)
+def get_message_templates(channel, language):
+    """Returns the compiled templates of a channel in a language (default language if not translated), once per process"""
+    messages = MESSAGES.get(language, MESSAGES[DEFAULT_LANGUAGE])
+    return {key: MessageTemplate(template) for key, template in messages[channel].items()}
+
+
+def render_care_message(channel, language, plant_action):
+    """Renders the care message of an ActionPlant for a channel (in_app, sms, email) in the user's language"""
+    templates = get_message_templates(channel, language)
+    lines = [templates['header'].render()]
+    for care_action in CARE_ACTIONS:
+        plants = getattr(plant_action, care_action)
+        if plants:
+            lines.append(templates[care_action].render(
+                count=len(plants), plant_names=', '.join(plant.name for plant in plants)
+            ))
+    return ''.join(lines)
@@ -1,5 +1,41 @@
+import logging
+from datetime import date
+
+from celery import group
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
 from pyPlants.data_classes.action_plant import ActionPlant
+from pyPlants.events import EventTypes, publish_events_on_commit
 from pyPlants.models import NotificationType, Notification, NotificationCenter
+from pyPlants.notification_manager.messages import render_care_message
+
+
+logger = logging.getLogger(__name__)
+
+
+# notification types delivered by a backend (see backends.py), in-app notifications are delivered once created
+DELIVERED_NOTIFICATION_TYPES = (NotificationType.EMAIL, NotificationType.SMS)
+
+
+def deliver_notifications(notifications, batch_size=None):
+    """
+    Queues the delivery of the pending email / sms notifications on the notifications queue,
+    by batches of NOTIFICATION_DELIVERY_BATCH_SIZE, once they are committed: the caller never waits for the providers.
+    """
+    from pyPlants.tasks import deliver_notification_batch
+    batch_size = batch_size or settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+    notification_ids = [
+        notification.id for notification in notifications
+        if notification.delivery_status == Notification.DeliveryStatus.PENDING
+    ]
+    if notification_ids:
+        batches = [notification_ids[i:i + batch_size] for i in range(0, len(notification_ids), batch_size)]
+        transaction.on_commit(
+            lambda: group(deliver_notification_batch.s(batch) for batch in batches).apply_async()
+        )
+    return notification_ids
 
 
 class NotificationManager:
@@ -12,6 +48,7 @@ class NotificationManager:
         self.should_send_email_notification = self.notification_center.enable_email_notifications
         self.should_send_sms_notification = self.notification_center.enable_sms_notifications
         self.plant_action = plant_action
+        self.language = self.notification_center.user.default_language
 
     def send_notifications(self):
         """
@@ -26,62 +63,132 @@ class NotificationManager:
             if self.should_send_sms_notification:
                 notifications.append(self.send_sms_notification())
         return notifications
+
+    def build_notifications(self):
+        """
+        Same as send_notifications, but the notifications are only built (not saved),
+        so that they can be written in batch by a NotificationBatch.
+        """
+        notifications = list()
+        if not self.plant_action.is_empty():
+            if self.should_send_in_app_notification:
+                notifications.append(
+                    self.build_notification(NotificationType.IN_APP, self.build_in_app_notification_message())
+                )
+            if self.should_send_email_notification:
+                notifications.append(
+                    self.build_notification(NotificationType.EMAIL, self.build_email_notification_message())
+                )
+            if self.should_send_sms_notification:
+                notifications.append(
+                    self.build_notification(NotificationType.SMS, self.build_sms_notification_message())
+                )
+        return notifications
+
+    def build_notification(self, notification_type, message):
+        # one digest per user, type and day: later notifications of the day update it
+        notification = Notification(
+            user=self.notification_center.user, message=message, notification_type=notification_type,
+            digest_date=date.today(),
+        )
+        if notification_type in DELIVERED_NOTIFICATION_TYPES:
+            notification.delivery_status = Notification.DeliveryStatus.PENDING
+        return notification
     
     def send_in_app_notification(self):
         message = self.build_in_app_notification_message()
-        notification = Notification.objects.create(
-            user=self.notification_center.user, message=message, notification_type=NotificationType.IN_APP
-        )
-        notification.mark_as_sent()
-        return notification
+        return self.send_notification(self.build_notification(NotificationType.IN_APP, message))
     
     def send_email_notification(self):
         message = self.build_email_notification_message()
-        notification = Notification.objects.create(
-            user=self.notification_center.user, message=message, notification_type=NotificationType.EMAIL
-        )
-        # send email logic here - async task(?)
-        return notification
+        return self.send_notification(self.build_notification(NotificationType.EMAIL, message))
     
     def send_sms_notification(self):
         message = self.build_sms_notification_message()
-        notification = Notification.objects.create(
-            user=self.notification_center.user, message=message, notification_type=NotificationType.SMS
-        )
-        # send sms logic here - async task(?)
-        return notification
+        return self.send_notification(self.build_notification(NotificationType.SMS, message))
+
+    @staticmethod
+    def send_notification(notification):
+        notification_batch = NotificationBatch()
+        notification_batch.add_notification(notification)
+        return notification_batch.send()[0]
 
     def build_in_app_notification_message(self):
-        message = f'Hey! It seems some of your plants need your attention! See below:'
-        if self.plant_action.water:
-            message += f'\nYou need to water: {", ".join(self.plant_action.water_plant_names())}.'
-        if self.plant_action.fertilize:
-            message += f'\nYou need to fertilize: {", ".join(self.plant_action.fertilize_plant_names())}.'
-        if self.plant_action.repot:
-            message += f'\nYou need to repot: {", ".join(self.plant_action.repot_plant_names())}.'
-        return message
+        return render_care_message('in_app', self.language, self.plant_action)
     
     def build_sms_notification_message(self):
-        message = f'Hey! It seems some of your plants need your attention!'
-        if self.plant_action.water:
-            message += f'\n{self.plant_action.count_plants_to_repot()} plant(s) need to be watered.'
-        if self.plant_action.fertilize:
-            message += f'\n{self.plant_action.count_plants_to_fertilize()} plant(s) need to be fertilized.'
-        if self.plant_action.repot:
-            message += f'\n{self.plant_action.count_plants_to_repot()} plant(s) need to be repotted.'
         # note add a link to the app
-        return message
+        return render_care_message('sms', self.language, self.plant_action)
     
     def build_email_notification_message(self):
-        message = f'Hey! \n A friendly email to let you know that some of your plants need your attention! See below:'
-        if self.plant_action.water:
-            message += (f'\nYou need to water {self.plant_action.count_plants_to_water()} plant(s)!\n'
-                        f'{", ".join(self.plant_action.water_plant_names())}.')
-        if self.plant_action.fertilize:
-            message += (f'\nYou need to fertilize {self.plant_action.count_plants_to_fertilize()} plant(s)!\n'
-                        f'{", ".join(self.plant_action.fertilize_plant_names())}.')
-        if self.plant_action.repot:
-            message += (f'\nYou need to repot {self.plant_action.count_plants_to_repot()} plant(s)!\n'
-                        f'{", ".join(self.plant_action.repot_plant_names())}.')
         # note add a link to the app
-        return message
+        return render_care_message('email', self.language, self.plant_action)
+
+
+class NotificationBatch:
+    """
+    Collects the notifications of many users (one NotificationManager each) and sends them at once:
+    a single upsert of the daily digests, then the in-app notifications are marked as sent with set-based updates.
+    """
+    def __init__(self):
+        # by digest key, a batch upserts each digest once
+        self.notifications = dict()
+
+    def add(self, notification_manager: NotificationManager):
+        notifications = notification_manager.build_notifications()
+        for notification in notifications:
+            self.add_notification(notification)
+        return notifications
+
+    def add_notification(self, notification: Notification):
+        self.notifications[notification.get_digest_key()] = notification
+
+    def send(self):
+        """
+        Writes the collected notifications and returns them.
+        A digest that already exists (same user, type and day) gets the new message and is unread again:
+        the unique digest constraint makes concurrent sends update the same row.
+        """
+        notifications, self.notifications = list(self.notifications.values()), dict()
+        if not notifications:
+            return notifications
+        Notification.objects.bulk_create(
+            notifications,
+            update_conflicts=True,
+            unique_fields=Notification.digest_fields,
+            update_fields=['message', 'viewed', 'viewed_at', 'updated'],
+        )
+        in_app_notifications = [
+            notification for notification in notifications if notification.notification_type == NotificationType.IN_APP
+        ]
+        if in_app_notifications:
+            sent_at = timezone.now()
+            Notification.objects.filter(
+                id__in=[notification.id for notification in in_app_notifications]
+            ).mark_as_sent(sent_at=sent_at)
+            for notification in in_app_notifications:
+                notification.sent = True
+                notification.sent_at = sent_at
+            # pushed to the connected clients
+            publish_events_on_commit([
+                (notification.user_id, EventTypes.NOTIFICATION, notification.get_event_data())
+                for notification in in_app_notifications
+            ])
+        # new digests and digests unread again: recompute the counters of the users
+        NotificationCenter.objects.filter(
+            user_id__in={notification.user_id for notification in notifications}
+        ).refresh_unread_notifications_count()
+        # the upsert does not return the stored delivery status: email / sms digests already delivered
+        # (or being delivered) today are not queued again
+        delivered_notifications = {
+            notification.id: notification for notification in notifications
+            if notification.notification_type in DELIVERED_NOTIFICATION_TYPES
+        }
+        if delivered_notifications:
+            for notification_id, delivery_status in Notification.objects.filter(
+                id__in=delivered_notifications.keys()
+            ).values_list('id', 'delivery_status'):
+                delivered_notifications[notification_id].delivery_status = delivery_status
+        deliver_notifications(notifications)
+        logger.info(f'{len(notifications)} notifications sent in batch')
+        return notifications
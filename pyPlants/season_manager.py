@@ -1,5 +1,7 @@
 import datetime
+import functools
 import logging
+from types import MappingProxyType
 
 from .constants import Seasons
 
@@ -7,93 +9,104 @@ from .constants import Seasons
 logger = logging.getLogger(__name__)
 
 
+SEASONS = MappingProxyType({
+    Seasons.SPRING: MappingProxyType(dict(start=(3, 20), end=(6, 20))),
+    Seasons.SUMMER: MappingProxyType(dict(start=(6, 21), end=(9, 21))),
+    Seasons.AUTUMN: MappingProxyType(dict(start=(9, 22), end=(12, 20))),
+    Seasons.WINTER: MappingProxyType(dict(start=(12, 21), end=(3, 19))),
+})
+HALF_YEARS = MappingProxyType({
+    Seasons.SPRING: Seasons.SUMMER,
+    Seasons.SUMMER: Seasons.SUMMER,
+    Seasons.AUTUMN: Seasons.WINTER,
+    Seasons.WINTER: Seasons.WINTER,
+})
+
+# Days elapsed before each month (1-indexed) in a leap year: every (month, day) gets its own slot, Feb 29th included
+_MONTH_OFFSETS = (0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def day_index(month, day):
+    """Returns the 0-based index of a (month, day) in the season calendar"""
+    return _MONTH_OFFSETS[month] + day - 1
+
+
+def _season_of(month, day):
+    for season, dates in SEASONS.items():
+        start, end = dates['start'], dates['end']
+        if start <= end:
+            if start <= (month, day) <= end:
+                return season
+        elif start <= (month, day) or (month, day) <= end:
+            return season
+
+
+# 366-entry day-of-year -> season / half year lookup tables (built from a leap year)
+SEASON_CALENDAR = tuple(
+    _season_of(day.month, day.day)
+    for day in (datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(366))
+)
+HALF_YEAR_CALENDAR = tuple(HALF_YEARS[season] for season in SEASON_CALENDAR)
+
+# season -> (start day index, end day index, whether the season crosses the year boundary)
+SEASON_BOUNDS = MappingProxyType({
+    season: (day_index(*dates['start']), day_index(*dates['end']), dates['start'] > dates['end'])
+    for season, dates in SEASONS.items()
+})
+
+
+@functools.lru_cache(maxsize=None)
+def season_start_date(season, year):
+    """Returns the start date of a season for a given year (memoized)"""
+    return datetime.date(year, *SEASONS[season]['start'])
+
+
 class SeasonManager:
     def __init__(self):
-        self.seasons = {
-            Seasons.SPRING: dict(start=(3, 20), end=(6, 20)),
-            Seasons.SUMMER: dict(start=(6, 21), end=(9, 21)),
-            Seasons.AUTUMN: dict(start=(9, 22), end=(12, 20)),
-            Seasons.WINTER: dict(start=(12, 21), end=(3, 19))
-        }
-        self.half_years = {
-            Seasons.SPRING: Seasons.SUMMER,
-            Seasons.SUMMER: Seasons.SUMMER,
-            Seasons.AUTUMN: Seasons.WINTER,
-            Seasons.WINTER: Seasons.WINTER
-        }
+        self.seasons = SEASONS
+        self.half_years = HALF_YEARS
+
+    @staticmethod
+    def _get_bounds(season):
+        try:
+            return SEASON_BOUNDS[season]
+        except (KeyError, TypeError):
+            raise ValueError("Invalid season")
 
     def get_season(self, date: datetime.date):
         """Returns the season for a given date"""
-        for season, dates in self.seasons.items():
-            if self.date_in_season(date, season):
-                return season
+        return SEASON_CALENDAR[day_index(date.month, date.day)]
 
     def get_half_year(self, date = None):
         """Returns the half year season (WINTER or SUMMER) for a given date"""
         if date is None:
             date = datetime.date.today()
-        return self.half_years[self.get_season(date)]
+        return HALF_YEAR_CALENDAR[day_index(date.month, date.day)]
 
     def date_in_season(self, date: datetime.date, season):
         """Returns True if the date is in the given season"""
-        if season not in self.seasons:
-            raise ValueError("Invalid season")
-        start = self.seasons[season]['start']
-        end = self.seasons[season]['end']
-        # Handle seasons that do not cross the year boundary
-        if start[0] < end[0] or (start[0] == end[0] and start[1] < end[1]):
-            return (start[0], start[1]) <= (date.month, date.day) <= (end[0], end[1])
-        # Handle seasons that cross the year boundary
-        else:
-            return (start[0], start[1]) <= (date.month, date.day) or (date.month, date.day) <= (end[0], end[1])
+        self._get_bounds(season)
+        return self.get_season(date) == season
 
     def get_start_date_of_current_or_next_seasons(self, date: datetime.date, season):
         """Given a date and a season, returns the start date of the season (current or next)"""
-        if season not in self.seasons:
-            raise ValueError("Invalid season")
-        current_year = date.year
-        start_month, start_day = self.seasons[season]['start']
-        end_month, end_day = self.seasons[season]['end']
-        if season == Seasons.WINTER:
-            season_start_date = datetime.date(current_year - 1, start_month, start_day)
-            season_end_date = datetime.date(current_year, end_month, end_day)
-            next_season_start_date = datetime.date(current_year, start_month, start_day)
-        else:
-            season_start_date = datetime.date(current_year, start_month, start_day)
-            season_end_date = datetime.date(current_year, end_month, end_day)
-            next_season_start_date = datetime.date(current_year + 1, start_month, start_day)
-        if season_start_date <= date <= season_end_date:
-            return season_start_date
-        if date < season_start_date:
-            return season_start_date
-        if date > season_end_date:
-            return next_season_start_date
+        _, end, crosses_year = self._get_bounds(season)
+        # a season crossing the year boundary (e.g. Winter) started the year before
+        start_year = date.year - 1 if crosses_year else date.year
+        if day_index(date.month, date.day) <= end:
+            return season_start_date(season, start_year)
+        return season_start_date(season, start_year + 1)
 
     def get_start_date_of_target_season(self, date: datetime.date, season):
         """
         Given a date and a target season, returns the start date of the target season
         in the current or next year.
         """
-        if season not in self.seasons:
-            raise ValueError("Invalid season")
-        start_month, start_day = self.seasons[season]['start']
-        end_month, end_day = self.seasons[season]['end']
-
-        # Handling the case for seasons that don't cross the year boundary
-        if start_month < end_month or (start_month == end_month and start_day < end_day):
-            if (date.month < start_month) or (date.month == start_month and date.day < start_day):
-                return datetime.date(date.year, start_month, start_day)
-            else:
-                return datetime.date(date.year + 1, start_month, start_day)
-
-        # Handling the case for seasons that cross the year boundary (e.g., Winter)
-        if (date.month < start_month) or (date.month == start_month and date.day < start_day):
-            return datetime.date(date.year, start_month, start_day)
-        elif (date.month > end_month) or (date.month == end_month and date.day > end_day):
-            return datetime.date(date.year + 1, start_month, start_day)
-        else:
-            # If the date is in the season, but we are targeting the next occurrence
-            return datetime.date(date.year + 1, start_month, start_day)
+        start, _, _ = self._get_bounds(season)
+        # If the date is in the season, we are targeting the next occurrence
+        if day_index(date.month, date.day) < start:
+            return season_start_date(season, date.year)
+        return season_start_date(season, date.year + 1)
 
     def get_current_season(self):
         """Returns the current season"""
@@ -112,4 +125,4 @@ class SeasonManager:
 
     def get_current_half_year(self):
         """Returns the current half year"""
-        return self.half_years[self.get_current_season()]
+        return self.get_half_year(datetime.date.today())
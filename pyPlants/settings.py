@@ -19,6 +19,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+# downsized copies generated for plant and AI images (long edge, in px)
+IMAGE_DERIVATIVE_SIZES = [128, 512, 1024]
+IMAGE_DERIVATIVE_QUALITY = 80
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -149,6 +152,50 @@ CELERY_RESULT_BACKEND = 'redis://localhost:6379'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
+# email / sms deliveries run on their own queue, so that slow providers never hold the other workers
+CELERY_TASK_ROUTES = {
+    'pyPlants.tasks.deliver_notification': {'queue': 'notifications'},
+    'pyPlants.tasks.deliver_notification_batch': {'queue': 'notifications'},
+}
+
+# Server-sent events (new notifications, AI answers status) are pushed through redis pub/sub
+EVENTS_REDIS_URL = CELERY_BROKER_URL
+# timeouts (in seconds) of the events redis connections, so that an unreachable redis never hangs a request
+EVENTS_REDIS_CONNECT_TIMEOUT = 2
+EVENTS_REDIS_SOCKET_TIMEOUT = 5
+# a stream lasts EVENTS_STREAM_TIMEOUT seconds (clients reconnect), with a keep-alive every EVENTS_HEARTBEAT_INTERVAL
+EVENTS_STREAM_TIMEOUT = 300
+EVENTS_HEARTBEAT_INTERVAL = 15
+
+# number of users checked by each task of the hourly care sweeps (one periodic task per notification hour, see
+# schedule_periodic_tasks)
+CHECK_PLANTS_SWEEP_CHUNK_SIZE = 500
+
+# Notifications delivery: backend per notification type (see pyPlants/notification_manager/backends.py)
+NOTIFICATION_BACKENDS = {
+    'EMAIL': 'pyPlants.notification_manager.backends.EmailBackend',
+    'SMS': 'pyPlants.notification_manager.backends.ConsoleBackend',
+}
+# directory of the FileBackend
+NOTIFICATION_FILE_PATH = os.path.join(BASE_DIR, 'notifications')
+# number of notifications delivered by each task (emails of a batch share one SMTP connection)
+NOTIFICATION_DELIVERY_BATCH_SIZE = 100
+# failed deliveries are retried with an exponential backoff (in seconds), then marked as failed
+NOTIFICATION_DELIVERY_MAX_RETRIES = 5
+NOTIFICATION_DELIVERY_RETRY_BACKOFF = 30
+NOTIFICATION_DELIVERY_RETRY_BACKOFF_MAX = 3600
+
+# notifications older than NOTIFICATION_RETENTION_DAYS are deleted every day at NOTIFICATION_RETENTION_HOUR,
+# by batches of NOTIFICATION_RETENTION_BATCH_SIZE rows
+NOTIFICATION_RETENTION_DAYS = 90
+NOTIFICATION_RETENTION_HOUR = 3
+NOTIFICATION_RETENTION_BATCH_SIZE = 1000
+
+# Emails (use 'django.core.mail.backends.smtp.EmailBackend' to send them through EMAIL_HOST:EMAIL_PORT)
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+EMAIL_HOST = 'localhost'
+EMAIL_PORT = 1025
+DEFAULT_FROM_EMAIL = 'WizPlant <no-reply@wizplant.app>'
 
 # User settings
 AUTH_USER_MODEL = 'pyPlants.PlantUser'
@@ -217,6 +264,22 @@ SIMPLE_JWT = {
 
 # maximum number of OPEN AI usage (up to 3 usage per plant) per user
 MAX_OPEN_API_USAGE = 50
+# plant checker answers are shared between users for the same plant name and language, for 30 days (in seconds)
+AI_PLANT_CHECKER_CACHE_TTL = 30 * 24 * 3600
+# plant names recognized from images are reused for images whose perceptual hash differs by at most 3 bits (out of 64).
+# Must stay below 4 (the number of indexed hash chunks) for the lookup to find every match
+AI_PLANT_RECOGNIZER_HASH_THRESHOLD = 3
+AI_PLANT_RECOGNIZER_CACHE_TTL = 30 * 24 * 3600
+# maximum number of concurrent async OpenAI requests of an AI answer (its plant checker and image generation)
+AI_MAX_CONCURRENT_REQUESTS = 4
+# images sent to the vision model are downscaled (long edge, in pixels) and re-encoded as JPEG.
+# The model works on a 768px short side at most: larger images only cost upload time
+AI_VISION_IMAGE_MAX_SIZE = 1024
+AI_VISION_IMAGE_QUALITY = 85
+# generated images are streamed to a temporary file: (connect, read) timeouts in seconds, max size in bytes
+AI_IMAGE_DOWNLOAD_TIMEOUT = (5, 30)
+AI_IMAGE_DOWNLOAD_MAX_SIZE = 20 * 1024 * 1024
+AI_IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 # OAUTH2_PROVIDER = {
 #     'SCOPES': {'read': 'Read scope', 'write': 'Write scope'}
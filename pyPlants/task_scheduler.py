@@ -1,22 +1,56 @@
+from django.conf import settings
 from django_celery_beat.models import PeriodicTask, CrontabSchedule
 
 
-def schedule_check_plant_task(notification_center):
+def get_check_plants_sweep_task_name(hour):
+    return f'Check plants sweep at {hour}h'
+
+
+def schedule_check_plants_sweep_task(hour):
     """
-    Schedule a task to check the plants of a user
+    Schedule the task that checks the plants of every user whose preferred notification hour is `hour`.
+    Users are not scheduled individually: changing a preferred notification hour only moves the user to another sweep.
+    The task is only written when it does not exist yet, so beat does not reload its schedule.
     """
-    user = notification_center.user
     schedule, _ = CrontabSchedule.objects.get_or_create(
-        hour=notification_center.preferred_notification_hour,
-        minute=0  # set to * for testing
+        hour=hour,
+        minute=0
     )
-    task, _ = PeriodicTask.objects.update_or_create(
-        # name is used to identify the task and query it later
-        name=f'Check plants for {user.email}',
+    task, _ = PeriodicTask.objects.get_or_create(
+        name=get_check_plants_sweep_task_name(hour),
         defaults=dict(
-            task='pyPlants.tasks.check_plants',
+            task='pyPlants.tasks.check_plants_sweep',
             crontab=schedule,
-            args=[user.id]
+            args=[hour]
         )
     )
     return task
+
+
+PURGE_NOTIFICATIONS_TASK_NAME = 'Purge notifications'
+
+
+def schedule_purge_notifications_task():
+    """Schedule the daily notification retention task"""
+    schedule, _ = CrontabSchedule.objects.get_or_create(
+        hour=settings.NOTIFICATION_RETENTION_HOUR,
+        minute=30
+    )
+    task, _ = PeriodicTask.objects.get_or_create(
+        name=PURGE_NOTIFICATIONS_TASK_NAME,
+        defaults=dict(
+            task='pyPlants.tasks.purge_notifications',
+            crontab=schedule,
+        )
+    )
+    return task
+
+
+def schedule_periodic_tasks():
+    """
+    Schedule all the global periodic tasks
+    """
+    return [
+        *(schedule_check_plants_sweep_task(hour) for hour in range(24)),
+        schedule_purge_notifications_task(),
+    ]
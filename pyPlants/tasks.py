@@ -1,31 +1,255 @@
 import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
 
-from celery import shared_task
+from celery import shared_task, group
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
 
-from pyPlants.models import PlantUser, Plant, NotificationCenter
-from pyPlants.notification_manager.service import NotificationManager
+from pyPlants.care_manager import CareManager
+from pyPlants.models import PlantUser, Plant, NotificationCenter, Notification
+from pyPlants.notification_manager.backends import get_backend
+from pyPlants.notification_manager.service import NotificationManager, NotificationBatch
 from pyPlants.data_classes.action_plant import ActionPlant
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def check_plants(user_id):
-    user = PlantUser.objects.get(id=user_id)
-    notification_center = NotificationCenter.objects.get(user=user)
-    plants = Plant.objects.filter(user=user, is_complete=True)
-
+def get_plant_action(plants):
+    """Returns the ActionPlant of the refreshed plants"""
     plant_action = ActionPlant()
 
     for plant in plants:
-        if plant.get_should_water():
+        if plant.should_water:
             plant_action.add_water(plant)
-        if plant.get_should_fertilize():
+        if plant.should_fertilize:
             plant_action.add_fertilize(plant)
-        if plant.get_should_repot():
+        if plant.should_repot:
             plant_action.add_repot(plant)
+    return plant_action
 
+
+def check_user_plants(notification_center: NotificationCenter):
+    """
+    Refreshes the care state of the user's plants and notifies the user if some of them need care.
+    Returns the notifications sent.
+    """
+    care_manager = CareManager()
+    # only plants with something due today can need care
+    plants = care_manager.bulk_refresh(
+        Plant.objects.filter(user_id=notification_center.user_id).due(today=care_manager.today)
+    )
+    plant_action = get_plant_action(plants)
+
+    notifications = list()
     if not plant_action.is_empty():
         notification_manager = NotificationManager(notification_center=notification_center, plant_action=plant_action)
         notifications = notification_manager.send_notifications()
         logger.info(f'{len(notifications)} Notifications sent!\nDetails:\n{notifications}')
+    return notifications
+
+
+def iter_user_id_chunks(hour, chunk_size):
+    """
+    Yields the ids of the active users whose preferred notification hour is `hour`, by chunks of `chunk_size`.
+    Users are paged by id (keyset pagination), so each chunk is a single indexed query whatever the offset.
+    """
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            NotificationCenter.objects.filter(
+                preferred_notification_hour=hour, user__is_active=True, user_id__gt=last_user_id
+            ).order_by('user_id').values_list('user_id', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+
+@shared_task
+def check_plants(user_id):
+    user = PlantUser.objects.get(id=user_id)
+    notification_center = NotificationCenter.objects.get(user=user)
+    check_user_plants(notification_center)
+
+
+@shared_task
+def check_plants_chunk(user_ids):
+    """
+    Checks the plants of a chunk of users: the due plants of the whole chunk are refreshed at once
+    and the notifications of every user are written in batch. Returns the number of notifications sent.
+    """
+    care_manager = CareManager()
+    plants = care_manager.bulk_refresh(Plant.objects.filter(user_id__in=user_ids).due(today=care_manager.today))
+    user_plants = defaultdict(list)
+    for plant in plants:
+        user_plants[plant.user_id].append(plant)
+
+    notification_batch = NotificationBatch()
+    notification_centers = NotificationCenter.objects.filter(user_id__in=user_plants.keys()).select_related('user')
+    for notification_center in notification_centers:
+        plant_action = get_plant_action(user_plants[notification_center.user_id])
+        notification_batch.add(NotificationManager(notification_center=notification_center, plant_action=plant_action))
+    notifications = notification_batch.send()
+    return len(notifications)
+
+
+@shared_task(bind=True)
+def check_plants_sweep(self, hour, chunk_size=None):
+    """
+    Daily care sweep for every user whose preferred notification hour is `hour`.
+    Users are paged in chunks that are fanned out as a celery group of `check_plants_chunk` tasks.
+    """
+    chunk_size = chunk_size or settings.CHECK_PLANTS_SWEEP_CHUNK_SIZE
+    users_count = 0
+    chunks = list()
+    for user_ids in iter_user_id_chunks(hour, chunk_size):
+        chunks.append(check_plants_chunk.s(user_ids))
+        users_count += len(user_ids)
+        if self.request.id:
+            self.update_state(state='PROGRESS', meta=dict(hour=hour, users=users_count, chunks=len(chunks)))
+    if chunks:
+        group(chunks).apply_async()
+    logger.info(f'Check plants sweep at {hour}h: {users_count} users dispatched in {len(chunks)} chunks')
+    return dict(hour=hour, users=users_count, chunks=len(chunks))
+
+
+@shared_task
+def process_plant_image(plant_id):
+    """Fixes the orientation of the plant image, resizes it and generates its derivatives, then updates the image status"""
+    plant = Plant.objects.filter(id=plant_id).first()
+    if plant is None or not plant.image:
+        return None
+    # the status is only updated if the image did not change in the meantime
+    plant_image = Plant.objects.filter(id=plant_id, image=plant.image.name)
+    plant_image.update(image_status=Plant.ImageStatusOptions.PROCESSING)
+    try:
+        plant.process_image()
+    except Exception as ex:
+        logger.exception(f'Could not process image of plant {plant_id}: {ex}')
+        plant_image.update(image_status=Plant.ImageStatusOptions.FAILED)
+        return Plant.ImageStatusOptions.FAILED
+    plant_image.update(image_status=Plant.ImageStatusOptions.READY, image_derivatives=plant.image_derivatives)
+    return Plant.ImageStatusOptions.READY
+
+
+def get_delivery_retry_countdown(retries):
+    """Exponential backoff (with jitter) before the next delivery attempt"""
+    return get_exponential_backoff_interval(
+        factor=settings.NOTIFICATION_DELIVERY_RETRY_BACKOFF,
+        retries=retries,
+        maximum=settings.NOTIFICATION_DELIVERY_RETRY_BACKOFF_MAX,
+        full_jitter=True,
+    )
+
+
+@shared_task(bind=True, max_retries=settings.NOTIFICATION_DELIVERY_MAX_RETRIES)
+def deliver_notification(self, notification_id):
+    """
+    Delivers an email / sms notification with the backend of its type (routed to the notifications queue).
+    Failed deliveries are retried with an exponential backoff, then the notification is marked as failed.
+    Returns the delivery status.
+    """
+    notifications = Notification.objects.filter(id=notification_id)
+    # not delivered (or being delivered) yet
+    if not notifications.claim_for_delivery([
+        Notification.DeliveryStatus.PENDING, Notification.DeliveryStatus.RETRYING, Notification.DeliveryStatus.FAILED
+    ]):
+        return None
+    notification = notifications.select_related('user').get()
+    try:
+        get_backend(notification.notification_type).send(notification)
+    except Exception as ex:
+        retry = getattr(ex, 'retry', True) and self.request.retries < self.max_retries
+        delivery_status = Notification.DeliveryStatus.RETRYING if retry else Notification.DeliveryStatus.FAILED
+        notifications.update(
+            delivery_status=delivery_status, delivery_attempts=F('delivery_attempts') + 1, delivery_error=str(ex)
+        )
+        if retry:
+            raise self.retry(exc=ex, countdown=get_delivery_retry_countdown(self.request.retries))
+        logger.exception(f'Could not deliver notification {notification_id}: {ex}')
+        return delivery_status
+    notifications.update(
+        delivery_status=Notification.DeliveryStatus.SENT, delivery_attempts=F('delivery_attempts') + 1,
+        delivery_error=None
+    )
+    notifications.mark_as_sent()
+    return Notification.DeliveryStatus.SENT
+
+
+@shared_task
+def deliver_notification_batch(notification_ids):
+    """
+    Delivers a batch of pending email / sms notifications with one backend call per notification type
+    (e.g. all the emails through a single SMTP connection), routed to the notifications queue.
+    Failed notifications are retried one by one by deliver_notification.
+    """
+    # the same digest may be queued by several batches (e.g. two sweeps while the queue is backed up)
+    claimed_ids = Notification.objects.filter(id__in=notification_ids).claim_for_delivery()
+    notifications = Notification.objects.select_related('user').filter(id__in=claimed_ids)
+    type_notifications = defaultdict(list)
+    for notification in notifications:
+        type_notifications[notification.notification_type].append(notification)
+
+    start = time.monotonic()
+    errors = dict()
+    for notification_type, notifications in type_notifications.items():
+        errors.update(get_backend(notification_type).send_many(notifications))
+    duration = time.monotonic() - start
+
+    sent_ids = [
+        notification.id for notifications in type_notifications.values() for notification in notifications
+        if notification.id not in errors
+    ]
+    if sent_ids:
+        sent_notifications = Notification.objects.filter(id__in=sent_ids)
+        sent_notifications.update(
+            delivery_status=Notification.DeliveryStatus.SENT, delivery_attempts=F('delivery_attempts') + 1,
+            delivery_error=None
+        )
+        sent_notifications.mark_as_sent()
+    for notification_id, error in errors.items():
+        retry = getattr(error, 'retry', True)
+        Notification.objects.filter(id=notification_id).update(
+            delivery_status=Notification.DeliveryStatus.RETRYING if retry else Notification.DeliveryStatus.FAILED,
+            delivery_attempts=F('delivery_attempts') + 1,
+            delivery_error=str(error),
+        )
+        if retry:
+            deliver_notification.apply_async((notification_id,), countdown=get_delivery_retry_countdown(0))
+
+    messages_per_second = round(len(sent_ids) / duration, 1) if duration else None
+    logger.info(
+        f'{len(sent_ids)} notifications delivered in {duration:.2f}s ({messages_per_second} messages/s), '
+        f'{len(errors)} failed'
+    )
+    return dict(sent=len(sent_ids), failed=len(errors), messages_per_second=messages_per_second)
+
+
+@shared_task
+def purge_notifications(retention_days=None, batch_size=None):
+    """
+    Deletes the notifications older than `retention_days`, by batches of `batch_size` rows (oldest first),
+    so that each DELETE stays short. The unread counters of the users who lost unread notifications are recomputed.
+    Returns the number of notifications deleted.
+    """
+    retention_days = retention_days or settings.NOTIFICATION_RETENTION_DAYS
+    batch_size = batch_size or settings.NOTIFICATION_RETENTION_BATCH_SIZE
+    expired_notifications = Notification.objects.filter(created__lt=timezone.now() - timedelta(days=retention_days))
+    deleted_count = 0
+    unread_user_ids = set()
+    while True:
+        rows = list(expired_notifications.order_by('id').values_list('id', 'user_id', 'viewed')[:batch_size])
+        if not rows:
+            break
+        unread_user_ids.update(user_id for _, user_id, viewed in rows if not viewed)
+        deleted, _ = Notification.objects.filter(id__in=[notification_id for notification_id, _, _ in rows]).delete()
+        deleted_count += deleted
+    if unread_user_ids:
+        NotificationCenter.objects.filter(user_id__in=unread_user_ids).refresh_unread_notifications_count()
+    logger.info(f'{deleted_count} notifications older than {retention_days} days deleted')
+    return deleted_count
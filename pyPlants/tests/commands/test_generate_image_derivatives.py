@@ -0,0 +1,28 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, tag
+
+from ai.models import AIPlantAnswer
+from pyPlants.models import PlantUser, Plant
+
+
+@tag('generate-image-derivatives-command')
+class GenerateImageDerivativesTest(TestCase):
+    @patch('ai.tasks.generate_ai_plant_answer_image_derivatives_task.delay')
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_generate_image_derivatives(self, process_plant_image_mock, ai_task_mock):
+        user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        plant = Plant.objects.create(name='Pachira', user=user, image='plant_pictures/pachira.jpg')
+        Plant.objects.create(name='Monstera', user=user)
+        Plant.objects.create(name='Ficus', user=user, image='plant_pictures/ficus.jpg')
+        Plant.objects.filter(name='Ficus').update(image_derivatives={'128': {}})
+        ai_plant_answer = AIPlantAnswer.objects.create(plant=plant, image='plant_logos/pachira.png')
+        AIPlantAnswer.objects.create(plant=plant)
+        with self.assertLogs('pyPlants.management.commands.generate_image_derivatives') as logs:
+            call_command('generate_image_derivatives')
+        process_plant_image_mock.assert_called_once_with(plant.id)
+        ai_task_mock.assert_called_once_with(ai_plant_answer.id)
+        self.assertIn('1 plant images scheduled', logs.output[0])
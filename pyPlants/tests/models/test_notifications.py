@@ -1,7 +1,9 @@
 from django.test import TestCase, tag
 from django.utils import timezone
+from freezegun import freeze_time
+from rest_framework.test import APIClient
 
-from pyPlants.models import PlantUser, NotificationCenter, Notification
+from pyPlants.models import PlantUser, NotificationCenter, Notification, Plant
 
 
 @tag('notifications')
@@ -28,3 +30,149 @@ class NotificationTest(TestCase):
         self.notification_center_1.preferred_notification_hour = 15
         self.notification_center_1.save()
         self.assertFalse(self.notification_center_1.enable_in_app_notifications)
+
+
+@tag('notifications')
+class NotificationUnreadCountTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.notifications = [
+            Notification.objects.create(user=self.user, message=f'Notification {i}') for i in range(3)
+        ]
+
+    def get_unread_count(self):
+        return NotificationCenter.objects.get(user=self.user).unread_notifications_count
+
+    def test_unread_count_on_creation(self):
+        self.assertEqual(self.get_unread_count(), 3)
+        Notification.objects.create(user=self.user, message='Viewed', viewed=True)
+        self.assertEqual(self.get_unread_count(), 3)
+
+    def test_unread_count_on_mark_as_viewed(self):
+        self.notifications[0].mark_as_viewed()
+        self.assertTrue(Notification.objects.get(id=self.notifications[0].id).viewed)
+        self.assertEqual(self.get_unread_count(), 2)
+        # already viewed
+        Notification.objects.get(id=self.notifications[0].id).mark_as_viewed()
+        self.assertEqual(self.get_unread_count(), 2)
+
+    def test_notification_center_save_keeps_unread_count(self):
+        notification_center = NotificationCenter.objects.get(user=self.user)
+        Notification.objects.create(user=self.user, message='Another one')
+        notification_center.preferred_notification_hour = 15
+        notification_center.save()
+        self.assertEqual(self.get_unread_count(), 4)
+
+    def test_refresh_unread_notifications_count(self):
+        NotificationCenter.objects.update(unread_notifications_count=0)
+        Notification.objects.filter(id=self.notifications[0].id).update(viewed=True)
+        NotificationCenter.objects.all().refresh_unread_notifications_count()
+        self.assertEqual(self.get_unread_count(), 2)
+
+    def test_unread_count_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = client.get('/api/notifications/unread-count/')
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(response.json(), dict(unread_count=3))
+
+    def test_bulk_mark_as_viewed(self):
+        other_user = PlantUser.objects.create_user(email='bar@bar.com')
+        other_notification = Notification.objects.create(user=other_user, message='Not mine')
+        self.notifications[0].mark_as_viewed()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(
+            '/api/notifications/mark-viewed/',
+            dict(ids=[self.notifications[0].id, self.notifications[1].id, other_notification.id]), format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        # already viewed and other users' notifications are not counted
+        self.assertDictEqual(response.json(), dict(count=1))
+        self.assertEqual(self.get_unread_count(), 1)
+        self.assertFalse(Notification.objects.get(id=other_notification.id).viewed)
+        response = client.post('/api/notifications/mark-all-viewed/')
+        self.assertDictEqual(response.json(), dict(count=1))
+        self.assertEqual(self.get_unread_count(), 0)
+        self.assertFalse(Notification.objects.filter(user=self.user, viewed=False).exists())
+        self.assertEqual(NotificationCenter.objects.get(user=other_user).unread_notifications_count, 1)
+
+    def test_mark_unread_notifications_as_viewed(self):
+        # the queryset no longer matches anything once updated
+        self.assertEqual(Notification.objects.filter(user=self.user, viewed=False).mark_as_viewed(), 3)
+        self.assertEqual(self.get_unread_count(), 0)
+
+    def test_bulk_mark_as_viewed_invalid(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/notifications/mark-viewed/', dict(ids=[]), format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@tag('plants')
+class PlantBulkCareEndpointTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        with freeze_time('2023-1-1'):
+            self.pachira = Plant.objects.create(
+                name='Pachira',
+                user=self.user,
+                water_frequency_summer=7,
+                water_frequency_winter=14,
+                sunlight=Plant.SunlightOptions.SHADE,
+                sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk_care(self, actions):
+        return self.client.post('/api/plants/bulk-care/', dict(actions=actions), format='json')
+
+    @freeze_time('2023-6-1')
+    def test_bulk_care(self):
+        response = self.bulk_care([dict(plant=self.pachira.id, action='water')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertSetEqual(set(response.data[0]), {
+            'id', 'last_watered', 'last_fertilized', 'last_repotted',
+            'next_water_date', 'should_water', 'next_fertilize_date', 'should_fertilize',
+            'next_repotting_date', 'should_repot', 'needs_care',
+        })
+        self.assertEqual(response.data[0]['id'], self.pachira.id)
+        self.assertEqual(response.data[0]['last_watered'], '2023-06-01')
+        self.assertEqual(response.data[0]['next_water_date'], '2023-06-08')
+        self.assertFalse(response.data[0]['needs_care'])
+
+    def test_bulk_care_unknown_plant(self):
+        response = self.bulk_care([dict(plant=self.pachira.id + 1000, action='water')])
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_care_other_user_plant(self):
+        other_user = PlantUser.objects.create_user(email='bar@foo.com')
+        other_plant = Plant.objects.create(name='Pilea', user=other_user)
+        response = self.bulk_care([
+            dict(plant=self.pachira.id, action='water'), dict(plant=other_plant.id, action='water'),
+        ])
+        self.assertEqual(response.status_code, 404)
+        # nothing is saved
+        self.assertIsNone(Plant.objects.get(id=self.pachira.id).last_watered)
+
+    def test_bulk_care_not_possible(self):
+        # the pachira does not need fertilizer
+        response = self.bulk_care([dict(plant=self.pachira.id, action='fertilize')])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+
+    def test_bulk_care_unknown_action(self):
+        response = self.bulk_care([dict(plant=self.pachira.id, action='prune')])
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_care_too_many_actions(self):
+        response = self.bulk_care([dict(plant=self.pachira.id, action='water')] * 101)
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(Plant.objects.get(id=self.pachira.id).last_watered)
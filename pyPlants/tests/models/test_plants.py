@@ -1,6 +1,9 @@
 from datetime import date, timedelta
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
 
 from pyPlants.constants import Seasons
@@ -332,3 +335,234 @@ class PlantTest(TestCase):
             self.plant_only_water.repot()
             dt = date(2024, 6, 21)
             self.assertEqual(self.plant_only_water.get_next_repotting_date(), dt)
+
+
+@tag('plant')
+class PlantCareWritesTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.plant = Plant.objects.create(
+            name='Pachira',
+            user=self.user,
+            water_frequency_summer=7,
+            water_frequency_winter=14,
+            sunlight=Plant.SunlightOptions.SHADE,
+            sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+            fertilizer=True,
+            fertilizer_season=Seasons.SPRING,
+            repotting=True,
+            repotting_season=Seasons.WINTER,
+        )
+
+    @freeze_time('2023-1-1')
+    def test_check_needs_care_computes_care_fields(self):
+        self.plant.check_needs_care()
+        plant = Plant.objects.get(id=self.plant.id)
+        self.assertTrue(plant.is_complete)
+        self.assertEqual(plant.next_water_date, date(2023, 1, 1))
+        self.assertTrue(plant.should_water)
+        self.assertEqual(plant.next_fertilize_date, date(2023, 3, 20))
+        self.assertFalse(plant.should_fertilize)
+        self.assertEqual(plant.next_repotting_date, date(2022, 12, 21))
+        self.assertTrue(plant.should_repot)
+        self.assertTrue(plant.needs_care)
+
+    def test_care_actions_single_write(self):
+        with self.assertNumQueries(1):
+            self.plant.water()
+        with self.assertNumQueries(1):
+            self.plant.fertilize()
+        with self.assertNumQueries(1):
+            self.plant.repot()
+
+    def test_check_needs_care_single_write(self):
+        with self.assertNumQueries(1):
+            self.plant.check_needs_care()
+
+    @freeze_time('2023-6-1')
+    def test_water_updates_care_fields(self):
+        self.plant.water()
+        plant = Plant.objects.get(id=self.plant.id)
+        self.assertEqual(plant.last_watered, date(2023, 6, 1))
+        self.assertEqual(plant.next_water_date, date(2023, 6, 8))
+        self.assertFalse(plant.should_water)
+
+    def test_save_with_update_fields_persists_care_fields(self):
+        with freeze_time('2023-6-1'):
+            self.plant.last_watered = date.today()
+            self.plant.save(update_fields=['last_watered'])
+        plant = Plant.objects.get(id=self.plant.id)
+        self.assertEqual(plant.next_water_date, date(2023, 6, 8))
+
+
+@tag('plant')
+class PlantDueTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        plant_kwargs = dict(
+            user=self.user,
+            water_frequency_summer=7,
+            water_frequency_winter=14,
+            sunlight=Plant.SunlightOptions.SHADE,
+            sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+        )
+        with freeze_time('2023-1-1'):
+            self.watered = Plant.objects.create(name='Watered', last_watered=date(2023, 1, 1), **plant_kwargs)
+            self.to_repot = Plant.objects.create(
+                name='To repot', last_watered=date(2023, 1, 1), repotting=True, repotting_season=Seasons.WINTER,
+                **plant_kwargs
+            )
+            self.to_fertilize = Plant.objects.create(
+                name='To fertilize', last_watered=date(2023, 1, 1), fertilizer=True,
+                fertilizer_season=Seasons.SPRING, **plant_kwargs
+            )
+            self.never_watered = Plant.objects.create(name='Never watered', **plant_kwargs)
+            self.incomplete = Plant.objects.create(name='Incomplete', user=self.user)
+
+    def test_due(self):
+        due_plants = Plant.objects.due(today=date(2023, 1, 2))
+        self.assertSetEqual(set(due_plants), {self.to_repot, self.never_watered})
+
+    def test_due_later(self):
+        # watering is due for every complete plant, spring has started
+        due_plants = Plant.objects.due(today=date(2023, 3, 20))
+        self.assertSetEqual(set(due_plants), {self.watered, self.to_repot, self.to_fertilize, self.never_watered})
+
+    def test_due_not_computed_yet(self):
+        Plant.objects.filter(id=self.watered.id).update(next_water_date=None)
+        due_plants = Plant.objects.filter(user=self.user).due(today=date(2023, 1, 2))
+        self.assertIn(self.watered, due_plants)
+
+
+@tag('plant')
+class PlantChangedFieldsTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        Plant.objects.create(
+            name='Pachira',
+            user=self.user,
+            water_frequency_summer=7,
+            water_frequency_winter=14,
+            sunlight=Plant.SunlightOptions.SHADE,
+            sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+        )
+        self.plant = Plant.objects.get(name='Pachira')
+
+    def test_get_changed_fields(self):
+        self.assertSetEqual(self.plant.get_changed_fields(), set())
+        self.plant.description = 'A nice plant'
+        self.plant.water_frequency_summer = 7
+        self.assertSetEqual(self.plant.get_changed_fields(), {'description'})
+        self.assertIsNone(Plant(name='Pilea', user=self.user).get_changed_fields())
+
+    def test_save_without_changes(self):
+        with self.assertNumQueries(0):
+            self.plant.save()
+
+    def test_save_only_changed_fields(self):
+        self.plant.description = 'A nice plant'
+        with patch('pyPlants.models.plant.CareManager.refresh') as refresh_mock:
+            with CaptureQueriesContext(connection) as context:
+                self.plant.save()
+        refresh_mock.assert_not_called()
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"description"', sql)
+        self.assertNotIn('"name"', sql)
+        self.assertNotIn('"next_water_date"', sql)
+        self.assertEqual(Plant.objects.get(id=self.plant.id).description, 'A nice plant')
+        # the plant is clean again once saved
+        self.assertSetEqual(self.plant.get_changed_fields(), set())
+
+    def test_save_care_relevant_change(self):
+        with freeze_time('2023-6-1'):
+            self.plant.last_watered = date.today()
+            with CaptureQueriesContext(connection) as context:
+                self.plant.save()
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"last_watered"', sql)
+        self.assertIn('"next_water_date"', sql)
+        plant = Plant.objects.get(id=self.plant.id)
+        self.assertEqual(plant.next_water_date, date(2023, 6, 8))
+
+    def test_save_completes_plant(self):
+        plant = Plant.objects.create(name='Pilea', user=self.user, water_frequency_summer=7, water_frequency_winter=14)
+        self.assertFalse(plant.is_complete)
+        self.assertIsNone(plant.next_water_date)
+        plant = Plant.objects.get(id=plant.id)
+        plant.sunlight = Plant.SunlightOptions.SHADE
+        plant.sun_exposure = Plant.SunExposureOptions.DIRECT_SUN
+        plant.save()
+        plant = Plant.objects.get(id=plant.id)
+        self.assertTrue(plant.is_complete)
+        self.assertIsNotNone(plant.next_water_date)
+
+    def test_save_deferred_field(self):
+        plant = Plant.objects.only('id').get(id=self.plant.id)
+        plant.description = 'A nice plant'
+        plant.save()
+        self.assertEqual(Plant.objects.get(id=self.plant.id).description, 'A nice plant')
+
+    def test_refresh_from_db(self):
+        Plant.objects.filter(id=self.plant.id).update(description='Updated elsewhere')
+        self.plant.refresh_from_db()
+        self.assertSetEqual(self.plant.get_changed_fields(), set())
+
+
+@tag('plant')
+class PlantBulkCareTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        plant_kwargs = dict(
+            user=self.user,
+            water_frequency_summer=7,
+            water_frequency_winter=14,
+            sunlight=Plant.SunlightOptions.SHADE,
+            sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+        )
+        with freeze_time('2023-1-1'):
+            self.pachira = Plant.objects.create(name='Pachira', **plant_kwargs)
+            self.pilea = Plant.objects.create(
+                name='Pilea', fertilizer=True, fertilizer_season=Seasons.WINTER, **plant_kwargs
+            )
+            self.incomplete = Plant.objects.create(name='Incomplete', user=self.user)
+
+    @freeze_time('2023-6-1')
+    def test_bulk_care(self):
+        actions = [
+            (self.pilea.id, 'water'), (self.pachira.id, 'water'), (self.pilea.id, 'fertilize'),
+            (self.incomplete.id, 'water'),
+        ]
+        # SAVEPOINT, SELECT ... FOR UPDATE, UPDATE, RELEASE SAVEPOINT: whatever the number of plants
+        with self.assertNumQueries(4):
+            plants = Plant.objects.filter(user=self.user).bulk_care(actions)
+        self.assertListEqual([plant.id for plant in plants], [self.pilea.id, self.pachira.id, self.incomplete.id])
+        pilea = Plant.objects.get(id=self.pilea.id)
+        self.assertEqual(pilea.last_watered, date(2023, 6, 1))
+        self.assertEqual(pilea.next_water_date, date(2023, 6, 8))
+        self.assertEqual(pilea.last_fertilized, date(2023, 6, 1))
+        self.assertEqual(pilea.next_fertilize_date, date(2023, 12, 21))
+        self.assertFalse(pilea.needs_care)
+        self.assertEqual(Plant.objects.get(id=self.pachira.id).last_watered, date(2023, 6, 1))
+        incomplete = Plant.objects.get(id=self.incomplete.id)
+        self.assertEqual(incomplete.last_watered, date(2023, 6, 1))
+        self.assertIsNone(incomplete.next_water_date)
+
+    def test_bulk_care_not_possible(self):
+        with self.assertRaises(ValueError):
+            Plant.objects.bulk_care([(self.pilea.id, 'water'), (self.pachira.id, 'fertilize')])
+        # nothing is saved
+        self.assertIsNone(Plant.objects.get(id=self.pilea.id).last_watered)
+
+    def test_bulk_care_other_user(self):
+        other_user = PlantUser.objects.create_user(email='bar@foo.com')
+        with self.assertRaises(Plant.DoesNotExist):
+            Plant.objects.filter(user=other_user).bulk_care([(self.pachira.id, 'water')])
@@ -1,3 +1,5 @@
+from datetime import date, timedelta
+
 from django.test import TestCase, tag
 from freezegun import freeze_time
 
@@ -46,14 +48,26 @@ class CheckPlantTest(TestCase):
         self.assertEqual(Notification.objects.count(), 1)
         notification = Notification.objects.first()
         self.assertEqual(notification.user, self.user)
+        # same day: the digest is updated instead of creating another notification
+        notification.mark_as_viewed()
         check_plants(self.user.id)
-        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(Notification.objects.count(), 1)
         notification = Notification.objects.last()
         self.assertEqual(notification.user, self.user)
+        self.assertFalse(notification.viewed)
         check_plants(self.user.id)
-        self.assertEqual(Notification.objects.count(), 3)
-        notification = Notification.objects.last()
-        self.assertEqual(notification.user, self.user)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_check_plants_next_day(self):
+        today = date.today()
+        check_plants(self.user.id)
+        with freeze_time(today + timedelta(days=1)):
+            check_plants(self.user.id)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertListEqual(
+            list(Notification.objects.order_by('digest_date').values_list('digest_date', flat=True)),
+            [today, today + timedelta(days=1)]
+        )
 
     def test_check_plants_does_not_trigger_when_watered(self):
         self.plant_only_water.water()
@@ -99,3 +113,20 @@ class CheckPlantTest(TestCase):
         self.assertEqual(Notification.objects.count(), 1)
         notification = Notification.objects.first()
         self.assertEqual(notification.user, self.user)
+
+    def test_check_plants_only_refreshes_due_plants(self):
+        with freeze_time('2023-01-01'):
+            self.plant_only_water.water()
+            plant_2 = Plant.objects.create(
+                name='Croton',
+                user=self.user,
+                water_frequency_summer=7,
+                water_frequency_winter=14,
+                sunlight=Plant.SunlightOptions.SHADE,
+                sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+            )
+        with freeze_time('2023-01-02'):
+            check_plants(self.user.id)
+            self.assertEqual(Notification.objects.count(), 1)
+            self.assertIn(plant_2.name, Notification.objects.first().message)
+            self.assertNotIn(self.plant_only_water.name, Notification.objects.first().message)
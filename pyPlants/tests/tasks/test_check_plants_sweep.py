@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django_celery_beat.models import PeriodicTask
+
+from pyPlants.models import PlantUser, NotificationCenter, Notification, Plant
+from pyPlants.task_scheduler import get_check_plants_sweep_task_name, schedule_periodic_tasks
+from pyPlants.tasks import iter_user_id_chunks, check_plants_chunk, check_plants_sweep
+
+
+@tag('check-plants-sweep-task')
+class CheckPlantsSweepTest(TestCase):
+    def setUp(self):
+        self.users = list()
+        for i in range(5):
+            user = PlantUser.objects.create_user(
+                email=f'foo{i}@bar.com'
+            )
+            notification_center = NotificationCenter.objects.get(user=user)
+            notification_center.preferred_notification_hour = 12
+            notification_center.save()
+            Plant.objects.create(
+                name='Pachira',
+                user=user,
+                water_frequency_summer=7,
+                water_frequency_winter=14,
+                sunlight=Plant.SunlightOptions.SHADE,
+                sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+            )
+            self.users.append(user)
+        # other hour
+        PlantUser.objects.create_user(email='bar@bar.com')
+
+    def test_iter_user_id_chunks(self):
+        chunks = list(iter_user_id_chunks(hour=12, chunk_size=2))
+        self.assertListEqual(chunks, [
+            [self.users[0].id, self.users[1].id],
+            [self.users[2].id, self.users[3].id],
+            [self.users[4].id],
+        ])
+        self.assertListEqual(list(iter_user_id_chunks(hour=3, chunk_size=2)), [])
+
+    def test_iter_user_id_chunks_skips_inactive_users(self):
+        self.users[0].is_active = False
+        self.users[0].save()
+        chunks = list(iter_user_id_chunks(hour=12, chunk_size=10))
+        self.assertListEqual(chunks, [[user.id for user in self.users[1:]]])
+
+    def test_check_plants_chunk(self):
+        notifications_count = check_plants_chunk([user.id for user in self.users[:3]])
+        self.assertEqual(notifications_count, 3)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertSetEqual(set(Notification.objects.values_list('user_id', flat=True)),
+                            {user.id for user in self.users[:3]})
+        self.assertFalse(Notification.objects.filter(sent=False).exists())
+        self.assertEqual(NotificationCenter.objects.filter(last_notification_sent__isnull=False).count(), 3)
+
+    def test_check_plants_chunk_queries(self):
+        # the number of queries does not depend on the number of users of the chunk
+        with CaptureQueriesContext(connection) as one_user_context:
+            check_plants_chunk([self.users[0].id])
+        with CaptureQueriesContext(connection) as many_users_context:
+            check_plants_chunk([user.id for user in self.users[1:]])
+        self.assertEqual(len(one_user_context.captured_queries), len(many_users_context.captured_queries))
+
+    @patch('pyPlants.tasks.group')
+    def test_check_plants_sweep(self, group_mock):
+        result = check_plants_sweep(12, chunk_size=2)
+        self.assertDictEqual(result, dict(hour=12, users=5, chunks=3))
+        group_mock.assert_called_once()
+        signatures = group_mock.call_args.args[0]
+        self.assertListEqual([signature.args[0] for signature in signatures],
+                             list(iter_user_id_chunks(hour=12, chunk_size=2)))
+        group_mock.return_value.apply_async.assert_called_once()
+
+    @patch('pyPlants.tasks.group')
+    def test_check_plants_sweep_no_users(self, group_mock):
+        result = check_plants_sweep(3)
+        self.assertDictEqual(result, dict(hour=3, users=0, chunks=0))
+        group_mock.assert_not_called()
+
+
+@tag('task-scheduler')
+class TaskSchedulerTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.notification_center = NotificationCenter.objects.get(user=self.user)
+
+    def test_notification_center_save_does_not_schedule(self):
+        self.notification_center.preferred_notification_hour = 15
+        # only the notification center row is written, beat tables are left untouched
+        with CaptureQueriesContext(connection) as context:
+            self.notification_center.save()
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('django_celery_beat', context.captured_queries[0]['sql'])
+        self.assertFalse(PeriodicTask.objects.filter(task='pyPlants.tasks.check_plants').exists())
+
+    def test_sweep_tasks_exist(self):
+        # created by the migrations
+        self.assertSetEqual(
+            set(PeriodicTask.objects.filter(task='pyPlants.tasks.check_plants_sweep').values_list('name', flat=True)),
+            {get_check_plants_sweep_task_name(hour) for hour in range(24)}
+        )
+
+    def test_schedule_periodic_tasks(self):
+        schedule_periodic_tasks()
+        schedule_periodic_tasks()
+        self.assertEqual(PeriodicTask.objects.filter(task='pyPlants.tasks.check_plants_sweep').count(), 24)
+        self.assertEqual(PeriodicTask.objects.filter(task='pyPlants.tasks.purge_notifications').count(), 1)
@@ -0,0 +1,177 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase, tag, override_settings
+
+from pyPlants.data_classes.action_plant import ActionPlant
+from pyPlants.models import PlantUser, NotificationCenter, Notification, NotificationType, Plant
+from pyPlants.notification_manager.backends import (
+    FileBackend, NotificationDeliveryError, get_backend
+)
+from pyPlants.notification_manager.service import NotificationManager
+from pyPlants.tasks import deliver_notification, deliver_notification_batch
+
+
+@tag('deliver-notification-task')
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DeliverNotificationTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.notification = Notification.objects.create(
+            user=self.user,
+            message='Water your plants',
+            notification_type=NotificationType.EMAIL,
+            delivery_status=Notification.DeliveryStatus.PENDING,
+        )
+
+    def test_deliver_notification(self):
+        self.assertEqual(deliver_notification(self.notification.id), Notification.DeliveryStatus.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertListEqual(mail.outbox[0].to, ['foo@bar.com'])
+        self.assertEqual(mail.outbox[0].body, 'Water your plants')
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.delivery_status, Notification.DeliveryStatus.SENT)
+        self.assertEqual(self.notification.delivery_attempts, 1)
+        self.assertTrue(self.notification.sent)
+        self.assertIsNotNone(NotificationCenter.objects.get(user=self.user).last_notification_sent)
+        # already delivered
+        self.assertIsNone(deliver_notification(self.notification.id))
+        self.assertEqual(len(mail.outbox), 1)
+
+    @patch('pyPlants.notification_manager.backends.EmailBackend.send')
+    def test_deliver_notification_retries(self, send_mock):
+        send_mock.side_effect = NotificationDeliveryError('Provider down')
+        result = deliver_notification.apply(args=(self.notification.id,))
+        self.assertEqual(result.get(propagate=False), Notification.DeliveryStatus.FAILED)
+        self.assertEqual(send_mock.call_count, deliver_notification.max_retries + 1)
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.delivery_status, Notification.DeliveryStatus.FAILED)
+        self.assertEqual(self.notification.delivery_attempts, deliver_notification.max_retries + 1)
+        self.assertEqual(self.notification.delivery_error, 'Provider down')
+        self.assertFalse(self.notification.sent)
+
+    def test_deliver_notification_no_recipient(self):
+        notification = Notification.objects.create(
+            user=self.user,
+            message='Water your plants',
+            notification_type=NotificationType.SMS,
+            delivery_status=Notification.DeliveryStatus.PENDING,
+        )
+        # no phone number: not retried
+        result = deliver_notification.apply(args=(notification.id,))
+        self.assertEqual(result.get(), Notification.DeliveryStatus.FAILED)
+        notification.refresh_from_db()
+        self.assertEqual(notification.delivery_attempts, 1)
+
+    def test_deliver_in_app_notification(self):
+        notification = Notification.objects.create(user=self.user, message='Water your plants')
+        self.assertIsNone(deliver_notification(notification.id))
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(NOTIFICATION_FILE_PATH=directory):
+            FileBackend().send(self.notification)
+            with open(os.path.join(directory, 'email.log')) as file:
+                line = json.loads(file.readline())
+        self.assertEqual(line['recipient'], 'foo@bar.com')
+        self.assertEqual(line['message'], 'Water your plants')
+
+    def test_get_backend(self):
+        self.assertIs(get_backend(NotificationType.EMAIL), get_backend(NotificationType.EMAIL))
+
+
+@tag('deliver-notification-task')
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend')
+class DeliverNotificationBatchTest(TestCase):
+    def setUp(self):
+        self.notifications = list()
+        for i in range(5):
+            user = PlantUser.objects.create_user(
+                email=f'foo{i}@bar.com'
+            )
+            self.notifications.append(Notification.objects.create(
+                user=user,
+                message='Water your plants',
+                notification_type=NotificationType.EMAIL,
+                delivery_status=Notification.DeliveryStatus.PENDING,
+            ))
+
+    @patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_deliver_notification_batch(self, smtp_mock):
+        result = deliver_notification_batch([notification.id for notification in self.notifications])
+        self.assertEqual(result['sent'], 5)
+        self.assertEqual(result['failed'], 0)
+        # a single connection for the whole batch
+        smtp_mock.assert_called_once()
+        self.assertEqual(smtp_mock.return_value.sendmail.call_count, 5)
+        self.assertEqual(
+            Notification.objects.filter(delivery_status=Notification.DeliveryStatus.SENT, sent=True).count(), 5
+        )
+
+    @patch('pyPlants.tasks.deliver_notification.apply_async')
+    @patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_deliver_notification_batch_failures(self, smtp_mock, apply_async_mock):
+        failed_notification = self.notifications[2]
+        smtp_mock.return_value.sendmail.side_effect = [None, None, OSError('Connection reset'), None, None]
+        result = deliver_notification_batch([notification.id for notification in self.notifications])
+        self.assertEqual(result['sent'], 4)
+        self.assertEqual(result['failed'], 1)
+        failed_notification.refresh_from_db()
+        self.assertEqual(failed_notification.delivery_status, Notification.DeliveryStatus.RETRYING)
+        self.assertEqual(failed_notification.delivery_error, 'Connection reset')
+        # retried on its own
+        apply_async_mock.assert_called_once()
+        self.assertEqual(apply_async_mock.call_args.args[0], (failed_notification.id,))
+
+    @patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_deliver_notification_batch_connection_error(self, smtp_mock):
+        smtp_mock.side_effect = ConnectionRefusedError('Connection refused')
+        with patch('pyPlants.tasks.deliver_notification.apply_async') as apply_async_mock:
+            result = deliver_notification_batch([notification.id for notification in self.notifications])
+        self.assertEqual(result['failed'], 5)
+        self.assertEqual(apply_async_mock.call_count, 5)
+        self.assertFalse(Notification.objects.filter(sent=True).exists())
+
+    @patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_deliver_notification_batch_queued_twice(self, smtp_mock):
+        notification_ids = [notification.id for notification in self.notifications]
+        # already claimed by another batch
+        Notification.objects.filter(id=notification_ids[0]).claim_for_delivery()
+        self.assertEqual(deliver_notification_batch(notification_ids)['sent'], 4)
+        self.assertEqual(deliver_notification_batch(notification_ids)['sent'], 0)
+        self.assertEqual(smtp_mock.return_value.sendmail.call_count, 4)
+
+
+@tag('deliver-notification-task')
+class DigestDeliveryTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        notification_center = NotificationCenter.objects.get(user=self.user)
+        notification_center.enable_in_app_notifications = False
+        notification_center.enable_email_notifications = True
+        notification_center.save()
+        action_plant = ActionPlant()
+        action_plant.add_water(Plant.objects.create(name='Pachira', user=self.user))
+        self.notification_manager = NotificationManager(
+            notification_center=notification_center, plant_action=action_plant
+        )
+
+    @patch('pyPlants.notification_manager.service.group')
+    def test_digest_queued_until_delivered(self, group_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = self.notification_manager.send_notifications()[0]
+        group_mock.assert_called_once()
+        [batch_signature] = group_mock.call_args.args[0]
+        self.assertEqual(batch_signature.args, ([notification.id],))
+        Notification.objects.filter(id=notification.id).update(delivery_status=Notification.DeliveryStatus.SENT)
+        # same digest later in the day: already delivered, not queued again
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = self.notification_manager.send_notifications()[0]
+        self.assertEqual(notification.delivery_status, Notification.DeliveryStatus.SENT)
+        group_mock.assert_called_once()
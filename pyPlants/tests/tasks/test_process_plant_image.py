@@ -0,0 +1,162 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, tag, override_settings
+
+from ai.models import AIPlantAnswer
+from pyPlants.image_derivatives import generate_image_derivatives
+from pyPlants.models import PlantUser, Plant
+from pyPlants.tasks import process_plant_image
+
+
+def build_image(size=(2048, 1024), orientation=None):
+    buffer = io.BytesIO()
+    img = Image.new('RGB', size, color='green')
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    img.save(buffer, format='JPEG', exif=exif)
+    return SimpleUploadedFile('plant.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@tag('process-plant-image-task')
+class ProcessPlantImageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.plant = Plant.objects.create(name='Pachira', user=self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_processing_scheduled_on_image_change(self, delay_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plant.image = build_image()
+            self.plant.save()
+        delay_mock.assert_called_once_with(self.plant.id)
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.image_status, Plant.ImageStatusOptions.PENDING)
+        # the image is not processed during the request
+        with Image.open(self.plant.image.path) as img:
+            self.assertEqual(img.size, (2048, 1024))
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_processing_not_scheduled_without_image_change(self, delay_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plant.image = build_image()
+            self.plant.save()
+        delay_mock.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            plant = Plant.objects.get(id=self.plant.id)
+            plant.description = 'A nice plant'
+            plant.save()
+            plant.water()
+        delay_mock.assert_not_called()
+        plant.refresh_from_db()
+        self.assertEqual(plant.image_status, Plant.ImageStatusOptions.PENDING)
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_image_removed(self, delay_mock):
+        self.plant.image = build_image()
+        self.plant.save()
+        self.plant.image = None
+        self.plant.save()
+        self.plant.refresh_from_db()
+        self.assertIsNone(self.plant.image_status)
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_process_plant_image(self, delay_mock):
+        self.plant.image = build_image(orientation=6)
+        self.plant.save()
+        self.assertEqual(process_plant_image(self.plant.id), Plant.ImageStatusOptions.READY)
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.image_status, Plant.ImageStatusOptions.READY)
+        with Image.open(self.plant.image.path) as img:
+            # rotated then resized
+            self.assertEqual(img.size, (512, 1024))
+            self.assertEqual(img.getexif().get(0x0112, 1), 1)
+        self.assertListEqual(list(self.plant.image_derivatives.keys()), ['1024', '512', '128'])
+        with self.plant.image.storage.open(self.plant.image_derivatives['128']['webp']) as file, Image.open(file) as img:
+            self.assertEqual(img.format, 'WEBP')
+            self.assertEqual(img.size, (64, 128))
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_image_change_resets_derivatives(self, delay_mock):
+        self.plant.image = build_image()
+        self.plant.save()
+        process_plant_image(self.plant.id)
+        self.plant.refresh_from_db()
+        self.assertIsNotNone(self.plant.image_derivatives)
+        self.plant.image = build_image()
+        self.plant.save()
+        self.plant.refresh_from_db()
+        self.assertIsNone(self.plant.image_derivatives)
+        self.assertEqual(self.plant.image_status, Plant.ImageStatusOptions.PENDING)
+
+    def get_derivative_names(self, derivatives):
+        return [name for names in derivatives.values() for name in names.values()]
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_image_change_deletes_derivatives(self, delay_mock):
+        self.plant.image = build_image()
+        self.plant.save()
+        process_plant_image(self.plant.id)
+        plant = Plant.objects.get(id=self.plant.id)
+        derivative_names = self.get_derivative_names(plant.image_derivatives)
+        self.assertTrue(all(plant.image.storage.exists(name) for name in derivative_names))
+        with self.captureOnCommitCallbacks(execute=True):
+            plant.image = build_image()
+            plant.save()
+        self.assertFalse(any(plant.image.storage.exists(name) for name in derivative_names))
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_reprocess_deletes_derivatives(self, delay_mock):
+        self.plant.image = build_image()
+        self.plant.save()
+        process_plant_image(self.plant.id)
+        plant = Plant.objects.get(id=self.plant.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            plant.process_image()
+        # only the new derivatives are left next to the image
+        self.assertEqual(len(os.listdir(os.path.dirname(plant.image.path))), 1 + 6)
+        self.assertTrue(all(
+            plant.image.storage.exists(name) for name in self.get_derivative_names(plant.image_derivatives)
+        ))
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_image_change_keeps_ai_plant_answer_derivatives(self, delay_mock):
+        ai_plant_answer = AIPlantAnswer.objects.create(plant=self.plant, image=build_image())
+        ai_plant_answer.image_derivatives = generate_image_derivatives(ai_plant_answer.image)
+        ai_plant_answer.save()
+        self.plant.link_processed_image(ai_plant_answer.image, ai_plant_answer.image_derivatives)
+        self.plant.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plant.image = build_image()
+            self.plant.save()
+        # still used by the AI plant answer
+        self.assertTrue(all(
+            ai_plant_answer.image.storage.exists(name)
+            for name in self.get_derivative_names(ai_plant_answer.image_derivatives)
+        ))
+
+    @patch('pyPlants.tasks.process_plant_image.delay')
+    def test_process_plant_image_failure(self, delay_mock):
+        self.plant.image = SimpleUploadedFile('plant.jpg', b'not an image', content_type='image/jpeg')
+        self.plant.save()
+        self.assertEqual(process_plant_image(self.plant.id), Plant.ImageStatusOptions.FAILED)
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.image_status, Plant.ImageStatusOptions.FAILED)
+
+    def test_process_plant_image_without_image(self):
+        self.assertIsNone(process_plant_image(self.plant.id))
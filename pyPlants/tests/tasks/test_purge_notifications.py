@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.test import TestCase, tag
+from django.utils import timezone
+
+from pyPlants.models import PlantUser, NotificationCenter, Notification
+from pyPlants.tasks import purge_notifications
+
+
+@tag('purge-notifications-task')
+class PurgeNotificationsTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        for i in range(5):
+            Notification.objects.create(user=self.user, message=f'Old notification {i}', viewed=i % 2 == 0)
+        Notification.objects.update(created=timezone.now() - timedelta(days=100))
+        self.recent_notification = Notification.objects.create(user=self.user, message='Recent notification')
+
+    def test_purge_notifications(self):
+        self.assertEqual(NotificationCenter.objects.get(user=self.user).unread_notifications_count, 3)
+        # 3 batches of 2
+        with self.assertNumQueries(3 * 2 + 1 + 1):
+            deleted_count = purge_notifications(retention_days=90, batch_size=2)
+        self.assertEqual(deleted_count, 5)
+        self.assertListEqual(list(Notification.objects.all()), [self.recent_notification])
+        self.assertEqual(NotificationCenter.objects.get(user=self.user).unread_notifications_count, 1)
+
+    def test_purge_notifications_retention(self):
+        self.assertEqual(purge_notifications(retention_days=120), 0)
+        self.assertEqual(Notification.objects.count(), 6)
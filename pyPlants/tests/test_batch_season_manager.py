@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+import random
+
+import numpy as np
+from django.test import TestCase, tag
+from django.utils import timezone
+
+from pyPlants.batch_season_manager import (
+    BatchSeasonManager, SEASON_CODES, to_date_array, to_season_array, to_dates
+)
+from pyPlants.care_manager import CareManager
+from pyPlants.constants import Seasons
+from pyPlants.models import PlantUser, Plant
+from pyPlants.season_manager import SeasonManager
+
+
+@tag('batch-season-manager')
+class BatchSeasonManagerTest(TestCase):
+    def setUp(self):
+        self.season_manager = SeasonManager()
+        self.batch_season_manager = BatchSeasonManager()
+        # every day of a leap year and the years around it
+        self.dates = [date(2023, 1, 1) + timedelta(days=i) for i in range(3 * 366)]
+        self.date_array = to_date_array(self.dates)
+
+    def test_conversions(self):
+        dates = [date(2023, 1, 1), None, date(1969, 12, 31)]
+        self.assertListEqual(to_dates(to_date_array(dates)), dates)
+        self.assertListEqual(to_season_array([Seasons.WINTER, None, 'foo']).tolist(),
+                             [SEASON_CODES[Seasons.WINTER], -1, -1])
+
+    def test_get_seasons(self):
+        seasons = self.batch_season_manager.get_seasons(self.date_array)
+        expected = [SEASON_CODES[self.season_manager.get_season(dt)] for dt in self.dates]
+        self.assertListEqual(seasons.tolist(), expected)
+
+    def test_get_start_date_of_current_or_next_seasons(self):
+        for season in SEASON_CODES:
+            seasons = to_season_array([season] * len(self.dates))
+            start_dates = self.batch_season_manager.get_start_date_of_current_or_next_seasons(self.date_array, seasons)
+            expected = [self.season_manager.get_start_date_of_current_or_next_seasons(dt, season) for dt in self.dates]
+            self.assertListEqual(to_dates(start_dates), expected)
+
+    def test_get_start_date_of_target_season(self):
+        for season in SEASON_CODES:
+            seasons = to_season_array([season] * len(self.dates))
+            start_dates = self.batch_season_manager.get_start_date_of_target_season(self.date_array, seasons)
+            expected = [self.season_manager.get_start_date_of_target_season(dt, season) for dt in self.dates]
+            self.assertListEqual(to_dates(start_dates), expected)
+
+    def test_invalid_season(self):
+        seasons = to_season_array([Seasons.WINTER, None])
+        dates = to_date_array([date(2023, 1, 1), date(2023, 1, 1)])
+        self.assertRaises(ValueError, self.batch_season_manager.get_start_date_of_target_season, dates, seasons)
+        # invalid seasons are allowed where the action is disabled
+        next_dates = self.batch_season_manager.get_next_season_dates(
+            np.datetime64('2023-01-01'), np.array([True, False]), seasons, dates
+        )
+        self.assertListEqual(to_dates(next_dates), [date(2023, 12, 21), None])
+
+    def test_care_states_match_care_manager(self):
+        rng = random.Random(42)
+        seasons = [Seasons.SPRING, Seasons.SUMMER, Seasons.AUTUMN, Seasons.WINTER]
+
+        def random_date():
+            return None if rng.random() < 0.25 else date(2022, 1, 1) + timedelta(days=rng.randint(0, 1000))
+
+        plants = list()
+        for _ in range(500):
+            fertilizer = rng.random() < 0.6
+            repotting = rng.random() < 0.6
+            plants.append(Plant(
+                last_watered=random_date(),
+                water_frequency_summer=rng.randint(1, 30),
+                water_frequency_winter=rng.randint(1, 30),
+                fertilizer=fertilizer,
+                fertilizer_season=rng.choice(seasons) if fertilizer else None,
+                last_fertilized=random_date(),
+                repotting=repotting,
+                repotting_season=rng.choice(seasons) if repotting else None,
+                last_repotted=random_date(),
+            ))
+        for _ in range(10):
+            care_manager = CareManager(today=date(2022, 1, 1) + timedelta(days=rng.randint(0, 1000)))
+            self.assertListEqual(care_manager.get_care_states(plants),
+                                 [care_manager.get_care_state(plant) for plant in plants])
+
+
+@tag('care-manager')
+class CareManagerRefreshAllTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        for i in range(5):
+            Plant.objects.create(
+                name=f'Pachira {i}',
+                user=self.user,
+                water_frequency_summer=7,
+                water_frequency_winter=14,
+                sunlight=Plant.SunlightOptions.SHADE,
+                sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+                repotting=True,
+                repotting_season=Seasons.WINTER,
+                last_watered=date(2023, 1, 1),
+            )
+
+    def test_refresh_all(self):
+        queryset = Plant.objects.filter(is_complete=True)
+        care_manager = CareManager(today=date(2023, 1, 15))
+        refreshed_at = timezone.now()
+        # 3 chunks (2 + 2 + 1) read and written, then an empty read
+        with self.assertNumQueries(3 * 2 + 1):
+            updated_count = care_manager.refresh_all(queryset, chunk_size=2)
+        self.assertEqual(updated_count, 5)
+        self.assertEqual(queryset.filter(updated__gte=refreshed_at).count(), 5)
+        for plant in queryset:
+            self.assertDictEqual({field: getattr(plant, field) for field in CareManager.care_fields},
+                                 care_manager.get_care_state(plant))
+        # nothing left to update
+        with self.assertNumQueries(2):
+            self.assertEqual(care_manager.refresh_all(queryset), 0)
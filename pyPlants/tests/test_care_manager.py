@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.test import TestCase, tag
+from freezegun import freeze_time
+
+from pyPlants.care_manager import CareManager
+from pyPlants.constants import Seasons
+from pyPlants.models import PlantUser, Plant
+
+
+@tag('care-manager')
+class CareManagerTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        with freeze_time('2023-1-1'):
+            self.plants = [
+                Plant.objects.create(
+                    name=f'Pachira {i}',
+                    user=self.user,
+                    water_frequency_summer=7,
+                    water_frequency_winter=14,
+                    sunlight=Plant.SunlightOptions.SHADE,
+                    sun_exposure=Plant.SunExposureOptions.DIRECT_SUN,
+                    fertilizer=True,
+                    fertilizer_season=Seasons.SPRING,
+                    last_watered=date(2023, 1, 1),
+                )
+                for i in range(10)
+            ]
+
+    def test_get_care_state(self):
+        care_manager = CareManager(today=date(2023, 1, 15))
+        care_state = care_manager.get_care_state(self.plants[0])
+        self.assertEqual(care_state['next_water_date'], date(2023, 1, 15))
+        self.assertTrue(care_state['should_water'])
+        self.assertEqual(care_state['next_fertilize_date'], date(2023, 3, 20))
+        self.assertFalse(care_state['should_fertilize'])
+        self.assertIsNone(care_state['next_repotting_date'])
+        self.assertFalse(care_state['should_repot'])
+
+    def test_bulk_refresh(self):
+        queryset = Plant.objects.filter(user=self.user)
+        # 1 SELECT + 1 UPDATE ... CASE for the whole batch
+        with self.assertNumQueries(2):
+            plants = CareManager(today=date(2023, 1, 15)).bulk_refresh(queryset)
+        self.assertEqual(len(plants), 10)
+        self.assertTrue(all(plant.should_water for plant in plants))
+        self.assertEqual(queryset.filter(should_water=True).count(), 10)
+        # stamped like every other write of the care state
+        self.assertFalse(queryset.filter(updated__date=date(2023, 1, 1)).exists())
+
+    def test_bulk_refresh_skips_unchanged_plants(self):
+        queryset = Plant.objects.filter(user=self.user)
+        # nothing changed since the plants were saved: no UPDATE
+        with self.assertNumQueries(1):
+            CareManager(today=date(2023, 1, 1)).bulk_refresh(queryset)
+
+    def test_bulk_refresh_batches(self):
+        queryset = Plant.objects.filter(user=self.user)
+        with self.assertNumQueries(1 + 4):
+            CareManager(today=date(2023, 1, 15)).bulk_refresh(queryset, batch_size=3)
@@ -0,0 +1,124 @@
+import json
+from unittest.mock import patch, AsyncMock
+
+import redis
+from django.conf import settings
+from django.test import TestCase, tag, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ai.models import AIPlantAnswer
+from pyPlants.data_classes.action_plant import ActionPlant
+from pyPlants.events import EventTypes, publish_events, subscribe, get_user_channel
+from pyPlants.models import PlantUser, Plant, NotificationCenter
+from pyPlants.notification_manager.service import NotificationManager
+
+
+@tag('events')
+class EventsTest(TestCase):
+    def setUp(self):
+        self.user = PlantUser.objects.create_user(
+            email='foo@bar.com'
+        )
+        self.plant = Plant.objects.create(name='Pachira', user=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+
+    @patch('pyPlants.events.get_redis')
+    def test_publish_events(self, get_redis_mock):
+        publish_events([(self.user.id, EventTypes.NOTIFICATION, dict(id=1))])
+        pipeline = get_redis_mock.return_value.pipeline.return_value
+        pipeline.publish.assert_called_once_with(
+            get_user_channel(self.user.id), json.dumps(dict(type=EventTypes.NOTIFICATION, data=dict(id=1)))
+        )
+        pipeline.execute.assert_called_once()
+
+    @patch('pyPlants.events.get_redis')
+    def test_publish_events_redis_down(self, get_redis_mock):
+        get_redis_mock.return_value.pipeline.return_value.execute.side_effect = redis.ConnectionError()
+        # best effort: does not raise
+        publish_events([(self.user.id, EventTypes.NOTIFICATION, dict(id=1))])
+
+    @patch('pyPlants.events.redis.asyncio.Redis.from_url')
+    async def test_subscribe(self, from_url_mock):
+        client = from_url_mock.return_value
+        client.aclose = AsyncMock()
+        pubsub = client.pubsub.return_value
+        pubsub.subscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.get_message = AsyncMock(side_effect=[
+            None, dict(data=json.dumps(dict(type=EventTypes.NOTIFICATION, data=dict(id=1)))), None,
+        ])
+        events = subscribe(self.user.id, timeout=60, heartbeat_interval=1)
+        self.assertListEqual(
+            [await anext(events), await anext(events), await anext(events)],
+            [None, dict(type=EventTypes.NOTIFICATION, data=dict(id=1)), None]
+        )
+        await events.aclose()
+        from_url_mock.assert_called_once_with(
+            settings.EVENTS_REDIS_URL,
+            socket_connect_timeout=settings.EVENTS_REDIS_CONNECT_TIMEOUT,
+            socket_timeout=1 + settings.EVENTS_REDIS_SOCKET_TIMEOUT,
+        )
+        pubsub.subscribe.assert_awaited_once_with(get_user_channel(self.user.id))
+        pubsub.aclose.assert_awaited_once()
+        client.aclose.assert_awaited_once()
+
+    @patch('pyPlants.events.publish_events')
+    def test_notification_events(self, publish_events_mock):
+        action_plant = ActionPlant()
+        action_plant.add_water(self.plant)
+        notification_manager = NotificationManager(
+            notification_center=NotificationCenter.objects.get(user=self.user), plant_action=action_plant
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications = notification_manager.send_notifications()
+        events = publish_events_mock.call_args.args[0]
+        self.assertEqual(len(events), 1)
+        user_id, event_type, data = events[0]
+        self.assertEqual(user_id, self.user.id)
+        self.assertEqual(event_type, EventTypes.NOTIFICATION)
+        self.assertEqual(data['id'], notifications[0].id)
+
+    @patch('pyPlants.events.publish_events')
+    def test_ai_plant_answer_events(self, publish_events_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            ai_plant_answer = AIPlantAnswer.objects.create(plant=self.plant)
+        self.assertEqual(publish_events_mock.call_count, 1)
+        ai_plant_answer = AIPlantAnswer.objects.get(id=ai_plant_answer.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            ai_plant_answer.is_checking_image = True
+            ai_plant_answer.save()
+        # status did not change
+        self.assertEqual(publish_events_mock.call_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ai_plant_answer.status = AIPlantAnswer.StatusChoice.IN_PROGRESS
+            ai_plant_answer.save()
+        self.assertEqual(publish_events_mock.call_count, 2)
+        user_id, event_type, data = publish_events_mock.call_args.args[0][0]
+        self.assertEqual(event_type, EventTypes.AI_PLANT_ANSWER)
+        self.assertEqual(data['status'], AIPlantAnswer.StatusChoice.IN_PROGRESS)
+
+    @override_settings(EVENTS_HEARTBEAT_INTERVAL=15)
+    @patch('api.views.events.subscribe')
+    async def test_event_stream(self, subscribe_mock):
+        async def events(user_id):
+            yield None
+            yield dict(type=EventTypes.NOTIFICATION, data=dict(id=1))
+
+        subscribe_mock.side_effect = events
+        response = await self.async_client.get(
+            '/api/events/', headers=dict(accept='text/event-stream', authorization=f'Bearer {self.token}')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(
+            b''.join(content).decode(),
+            'retry: 15000\n\n: keep-alive\n\nevent: notification\ndata: {"id": 1}\n\n'
+        )
+        subscribe_mock.assert_called_once_with(self.user.id)
+
+    async def test_event_stream_unauthenticated(self):
+        response = await self.async_client.get('/api/events/', headers=dict(accept='text/event-stream'))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/events/', headers=dict(authorization='Bearer invalid'))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,65 @@
+import io
+import shutil
+import tempfile
+
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import FieldFile
+from django.test import TestCase, tag, override_settings, RequestFactory
+
+from pyPlants.image_derivatives import generate_image_derivatives, get_image_derivative_urls, get_derivative_name
+from pyPlants.models import Plant
+
+
+@tag('image-derivatives')
+class ImageDerivativesTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_URL='/media/')
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def save_image(self, mode='RGB', size=(1024, 768), img_format='PNG', name='logos/plant.png'):
+        buffer = io.BytesIO()
+        Image.new(mode, size).save(buffer, format=img_format)
+        name = default_storage.save(name, ContentFile(buffer.getvalue()))
+        return FieldFile(instance=None, field=Plant._meta.get_field('image'), name=name)
+
+    def test_get_derivative_name(self):
+        self.assertEqual(get_derivative_name('logos/plant.png', 128, 'webp'), 'logos/plant_128.webp')
+
+    def test_generate_image_derivatives(self):
+        field_file = self.save_image()
+        derivatives = generate_image_derivatives(field_file, sizes=[128, 512])
+        self.assertDictEqual(derivatives, {
+            '512': {'webp': 'logos/plant_512.webp', 'jpeg': 'logos/plant_512.jpeg'},
+            '128': {'webp': 'logos/plant_128.webp', 'jpeg': 'logos/plant_128.jpeg'},
+        })
+        with default_storage.open(derivatives['512']['jpeg']) as file, Image.open(file) as img:
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, (512, 384))
+        with default_storage.open(derivatives['128']['webp']) as file, Image.open(file) as img:
+            self.assertEqual(img.format, 'WEBP')
+            self.assertEqual(img.size, (128, 96))
+
+    def test_generate_image_derivatives_transparent_image(self):
+        for mode in ['RGBA', 'P', 'LA']:
+            field_file = self.save_image(mode=mode, name=f'logos/plant_{mode}.png')
+            derivatives = generate_image_derivatives(field_file, sizes=[128])
+            with default_storage.open(derivatives['128']['jpeg']) as file, Image.open(file) as img:
+                self.assertEqual(img.mode, 'RGB')
+
+    def test_get_image_derivative_urls(self):
+        field_file = self.save_image()
+        derivatives = generate_image_derivatives(field_file, sizes=[128])
+        self.assertDictEqual(get_image_derivative_urls(field_file, derivatives), {
+            '128': {'webp': '/media/logos/plant_128.webp', 'jpeg': '/media/logos/plant_128.jpeg'},
+        })
+        request = RequestFactory().get('/')
+        urls = get_image_derivative_urls(field_file, derivatives, request=request)
+        self.assertEqual(urls['128']['webp'], 'http://testserver/media/logos/plant_128.webp')
+        self.assertIsNone(get_image_derivative_urls(field_file, None))
@@ -1,9 +1,11 @@
+from unittest.mock import patch
+
 from django.test import TestCase, tag
 
 from pyPlants.constants import Seasons, Notifications
 from pyPlants.data_classes.action_plant import ActionPlant
 from pyPlants.models import PlantUser, Plant, NotificationCenter, Notification
-from pyPlants.notification_manager.service import NotificationManager
+from pyPlants.notification_manager.service import NotificationManager, NotificationBatch
 
 
 @tag('notification-manager')
@@ -86,3 +88,97 @@ class NotificationManagerTest(TestCase):
         self.assertTrue(notification_in_app.sent)
         self.assertFalse(notification_sms.sent)
         self.assertFalse(notification_email.sent)
+
+
+@tag('notification-manager')
+class NotificationBatchTest(TestCase):
+    def setUp(self):
+        self.notification_managers = list()
+        for i in range(3):
+            user = PlantUser.objects.create_user(
+                email=f'foo{i}@bar.com'
+            )
+            notification_center = NotificationCenter.objects.get(user=user)
+            notification_center.enable_email_notifications = True
+            notification_center.save()
+            plant = Plant.objects.create(
+                name='Pachira',
+                user=user,
+                water_frequency_summer=7,
+                water_frequency_winter=14,
+            )
+            action_plant = ActionPlant()
+            action_plant.add_water(plant)
+            self.notification_managers.append(
+                NotificationManager(notification_center=notification_center, plant_action=action_plant)
+            )
+
+    def test_send(self):
+        notification_batch = NotificationBatch()
+        for notification_manager in self.notification_managers:
+            self.assertEqual(len(notification_batch.add(notification_manager)), 2)
+        self.assertEqual(Notification.objects.count(), 0)
+        # bulk_create, one UPDATE for the notification centers and one for the notifications (sent),
+        # then one for the unread counters and one SELECT of the stored delivery statuses
+        with self.assertNumQueries(5):
+            notifications = notification_batch.send()
+        self.assertEqual(len(notifications), 6)
+        self.assertEqual(Notification.objects.count(), 6)
+        in_app_notifications = Notification.objects.filter(notification_type=Notifications.IN_APP)
+        self.assertEqual(in_app_notifications.filter(sent=True, sent_at__isnull=False).count(), 3)
+        self.assertFalse(Notification.objects.filter(notification_type=Notifications.EMAIL, sent=True).exists())
+        self.assertFalse(NotificationCenter.objects.filter(last_notification_sent__isnull=True).exists())
+        for notification in notifications:
+            self.assertIsNotNone(notification.id)
+            self.assertEqual(notification.sent, notification.notification_type == Notifications.IN_APP)
+        # the batch is empty once sent
+        self.assertListEqual(notification_batch.send(), [])
+
+    def test_send_coalesces_daily_digests(self):
+        notification_batch = NotificationBatch()
+        for notification_manager in self.notification_managers:
+            notification_batch.add(notification_manager)
+        notifications = notification_batch.send()
+        Notification.objects.filter(notification_type=Notifications.EMAIL).update(
+            delivery_status=Notification.DeliveryStatus.SENT
+        )
+        Notification.objects.update(viewed=True)
+        for notification_manager in self.notification_managers:
+            notification_manager.plant_action.add_repot(notification_manager.plant_action.water[0])
+            notification_batch.add(notification_manager)
+        digests = notification_batch.send()
+        self.assertEqual(Notification.objects.count(), 6)
+        self.assertSetEqual({digest.id for digest in digests}, {notification.id for notification in notifications})
+        for notification in Notification.objects.all():
+            self.assertIn('repot', notification.message)
+            self.assertFalse(notification.viewed)
+        # the email digests were already delivered: they are not queued again
+        for digest in digests:
+            if digest.notification_type == Notifications.EMAIL:
+                self.assertEqual(digest.delivery_status, Notification.DeliveryStatus.SENT)
+        # one in-app and one email digest per user, both unread
+        self.assertSetEqual(set(NotificationCenter.objects.values_list('unread_notifications_count', flat=True)), {2})
+        # emails already delivered today are not delivered again
+        self.assertFalse(
+            Notification.objects.filter(notification_type=Notifications.EMAIL).exclude(
+                delivery_status=Notification.DeliveryStatus.SENT
+            ).exists()
+        )
+
+    @patch('pyPlants.notification_manager.service.group')
+    def test_send_queues_deliveries(self, group_mock):
+        notification_batch = NotificationBatch()
+        for notification_manager in self.notification_managers:
+            notification_batch.add(notification_manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications = notification_batch.send()
+        # only email notifications are delivered by a backend, in one batch here
+        signatures = list(group_mock.call_args.args[0])
+        self.assertListEqual(
+            [signature.args[0] for signature in signatures],
+            [[notification.id for notification in notifications
+              if notification.notification_type == Notifications.EMAIL]]
+        )
+        group_mock.return_value.apply_async.assert_called_once()
+        for notification in Notification.objects.filter(notification_type=Notifications.EMAIL):
+            self.assertEqual(notification.delivery_status, Notification.DeliveryStatus.PENDING)
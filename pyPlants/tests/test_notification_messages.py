@@ -0,0 +1,62 @@
+from django.test import TestCase, tag
+
+from pyPlants.data_classes.action_plant import ActionPlant
+from pyPlants.models import PlantUser, Plant, NotificationCenter
+from pyPlants.notification_manager.messages import MessageTemplate, get_message_templates, render_care_message
+from pyPlants.notification_manager.service import NotificationManager
+
+
+@tag('notification-messages')
+class NotificationMessagesTest(TestCase):
+    def setUp(self):
+        self.plant_action = ActionPlant()
+        self.plant_action.add_water(Plant(name='Pachira'))
+        self.plant_action.add_water(Plant(name='Pilea'))
+        self.plant_action.add_repot(Plant(name='Tea Tree'))
+
+    def test_message_template(self):
+        template = MessageTemplate('\nYou need to water {count} plant(s)!\n{plant_names}.')
+        self.assertEqual(template.render(count=2, plant_names='Pachira, Pilea'),
+                         '\nYou need to water 2 plant(s)!\nPachira, Pilea.')
+        self.assertEqual(MessageTemplate('No field').render(), 'No field')
+
+    def test_templates_are_compiled_once(self):
+        self.assertIs(get_message_templates('sms', 'EN'), get_message_templates('sms', 'EN'))
+
+    def test_render_in_app_message(self):
+        self.assertEqual(
+            render_care_message('in_app', PlantUser.LanguageChoices.ENGLISH, self.plant_action),
+            'Hey! It seems some of your plants need your attention! See below:'
+            '\nYou need to water: Pachira, Pilea.'
+            '\nYou need to repot: Tea Tree.'
+        )
+
+    def test_render_sms_message(self):
+        self.assertEqual(
+            render_care_message('sms', PlantUser.LanguageChoices.ENGLISH, self.plant_action),
+            'Hey! It seems some of your plants need your attention!'
+            '\n2 plant(s) need to be watered.'
+            '\n1 plant(s) need to be repotted.'
+        )
+
+    def test_render_french_message(self):
+        self.assertEqual(
+            render_care_message('email', PlantUser.LanguageChoices.FRENCH, self.plant_action),
+            'Hey ! \n Un petit email pour vous dire que certaines de vos plantes ont besoin de votre attention ! '
+            'Voir ci-dessous :'
+            '\nVous devez arroser 2 plante(s) !\nPachira, Pilea.'
+            '\nVous devez rempoter 1 plante(s) !\nTea Tree.'
+        )
+
+    def test_render_unknown_language(self):
+        self.assertEqual(
+            render_care_message('sms', 'DE', self.plant_action),
+            render_care_message('sms', PlantUser.LanguageChoices.ENGLISH, self.plant_action)
+        )
+
+    def test_notification_manager_language(self):
+        user = PlantUser.objects.create_user(email='foo@bar.com', default_language=PlantUser.LanguageChoices.FRENCH)
+        notification_manager = NotificationManager(
+            notification_center=NotificationCenter.objects.get(user=user), plant_action=self.plant_action
+        )
+        self.assertTrue(notification_manager.build_in_app_notification_message().startswith('Hey ! Certaines'))
@@ -1,7 +1,7 @@
 from datetime import date
 
 from django.test import TestCase, tag
-from pyPlants.season_manager import SeasonManager
+from pyPlants.season_manager import SeasonManager, SEASON_CALENDAR, HALF_YEAR_CALENDAR, day_index, season_start_date
 from pyPlants.constants import Seasons
 
 
@@ -147,3 +147,24 @@ class SeasonManagerTest(TestCase):
         )
         # error case
         self.assertRaises(ValueError, season_manager.get_start_date_of_target_season, date=date(2023, 3, 19), season='foo')
+
+    def test_season_calendar(self):
+        self.assertEqual(len(SEASON_CALENDAR), 366)
+        self.assertEqual(len(HALF_YEAR_CALENDAR), 366)
+        self.assertEqual(SEASON_CALENDAR[day_index(2, 29)], Seasons.WINTER)
+        self.assertEqual(SEASON_CALENDAR[day_index(3, 1)], Seasons.WINTER)
+        self.assertEqual(SEASON_CALENDAR[day_index(12, 31)], Seasons.WINTER)
+        # leap and non leap years share the same calendar
+        self.assertEqual(self.season_manager.get_season(date=date(2024, 2, 29)), Seasons.WINTER)
+        self.assertEqual(self.season_manager.get_season(date=date(2024, 3, 20)), Seasons.SPRING)
+        self.assertEqual(self.season_manager.get_season(date=date(2023, 3, 20)), Seasons.SPRING)
+
+    def test_season_start_date(self):
+        self.assertEqual(season_start_date(Seasons.WINTER, 2023), date(2023, 12, 21))
+        self.assertIs(season_start_date(Seasons.WINTER, 2023), season_start_date(Seasons.WINTER, 2023))
+        self.assertEqual(
+            self.season_manager.get_next_or_current_season_start_date(season=Seasons.SPRING, date=date(2024, 2, 29)),
+            date(2024, 3, 20)
+        )
+        # error case
+        self.assertRaises(ValueError, self.season_manager.get_next_or_current_season_start_date, season=None)